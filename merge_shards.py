@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+import argparse
+import textwrap
+from argparse import Namespace
+
+from pylib import shards
+from pylib import summary
+from pylib import utils
+from reconcile import zip_files
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        fromfile_prefix_chars="@",
+        description=textwrap.dedent(
+            """
+            Merge the shard files written by "reconcile.py --shard I/N" into the
+            same output files that a single reconcile.py run would write."""
+        ),
+    )
+
+    parser.add_argument(
+        "shard_files",
+        metavar="SHARD-FILE",
+        nargs="+",
+        help="""The shard files to merge. You need one for every shard.""",
+    )
+
+    parser.add_argument(
+        "-u",
+        "--unreconciled",
+        help="""Write the unreconciled workflow classifications to this CSV file.""",
+    )
+
+    parser.add_argument(
+        "-r",
+        "--reconciled",
+        help="""Write the reconciled classifications to this CSV file.""",
+    )
+
+    parser.add_argument(
+        "-s",
+        "--summary",
+        help="""Write a summary of the reconciliation to this HTML file.""",
+    )
+
+    parser.add_argument(
+        "-e",
+        "--explanations",
+        action="store_true",
+        help="""Output the reconciled explanations with the reconciled classifications
+            CSV file.""",
+    )
+
+    parser.add_argument(
+        "-z",
+        "--zip",
+        help="""Zip the output files and put them into this archive.""",
+    )
+
+    parser.add_argument(
+        "--page-size",
+        default=20,
+        type=int,
+        help="""Page size for the summary report's detail section.
+            (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "--no-summary-detail",
+        action="store_true",
+        help="""Skip the Reconciliation Detail section in the summary report.""",
+    )
+
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    merge_args = parse_args()
+
+    try:
+        shard_args, unreconciled, reconciled = shards.merge(merge_args.shard_files)
+    except utils.ReconcileError as err:
+        utils.error_exit(str(err))
+
+    args = Namespace(**(shard_args | vars(merge_args)))
+
+    if args.unreconciled:
+        unreconciled.to_csv(args, args.unreconciled)
+
+    if args.reconciled:
+        reconciled.to_csv(args, args.reconciled, args.explanations)
+
+    if args.summary:
+        summary.report(args, unreconciled, reconciled)
+
+    if args.zip:
+        zip_files(args)
+
+
+if __name__ == "__main__":
+    main()
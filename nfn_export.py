@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import shlex
+import shutil
+import sys
+import textwrap
+import traceback
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import reconcile
+from pylib import utils
+
+ROOT = Path(__file__).parent
+HELP_PDF = ROOT / "misc" / "NfN_Reconciliation_HelpV1.0.pdf"
+MANIFEST_COLUMNS = ["export", "workflow_id", "name", "args", "copy_to"]
+
+
+@dataclass(kw_only=True)
+class Entry:
+    """One expedition to reconcile, a row in the manifest."""
+
+    export: str
+    workflow_id: str
+    name: str
+    args: str = ""
+    copy_to: str = ""
+
+    @property
+    def prefix(self) -> str:
+        return f"{self.workflow_id}_{self.name}"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    argv = attach_args(sys.argv[1:] if argv is None else argv)
+
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        fromfile_prefix_chars="@",
+        description=textwrap.dedent(
+            """
+            Reconcile Notes from Nature expedition exports into the folders that
+            we send back to the expeditions. Each expedition gets a folder named
+            "<WORKFLOW-ID>_<RENAME-TO>" in the output directory with a copy of the
+            raw export, the help PDF, and the reconcile.py output files.
+
+            Give either one expedition with -w, -r, & -e, or a --manifest of
+            them. A manifest is a CSV file with the columns: export,
+            workflow_id, name, args, and copy_to. Only the first three are
+            required. The expeditions run in parallel, and the expeditions
+            that use the same export file share one parsed copy of it."""
+        ),
+    )
+
+    parser.add_argument(
+        "-v",
+        "--version",
+        default=reconcile.VERSION,
+        metavar="RECONCILER-VERSION",
+        help="""The version of reconcile.py. This gets inserted into output file
+            names. (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "-w",
+        "--workflow-id",
+        metavar="WORKFLOW-ID",
+        help="""The expedition's workflow ID. This will be prepended to output file
+            names.""",
+    )
+
+    parser.add_argument(
+        "-r",
+        "--rename-to",
+        metavar="RENAME-TO",
+        help="""The output file names without the RECONCILER-VERSION or
+            WORKFLOW-ID.""",
+    )
+
+    parser.add_argument(
+        "-a",
+        "--args",
+        default="",
+        metavar="ARGS",
+        help="""Any extra arguments to pass to reconcile.py. If you have many,
+            quote them.""",
+    )
+
+    parser.add_argument(
+        "-c",
+        "--copy-to",
+        default="",
+        metavar="COPY-TO",
+        help="""Copy the output files to this directory.""",
+    )
+
+    parser.add_argument(
+        "-e",
+        "--export",
+        metavar="EXPORT-FILE-NAME",
+        help="""The raw input file that reconcile.py uses as input.""",
+    )
+
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        type=Path,
+        metavar="PATH",
+        help="""Reconcile every expedition in this CSV file.""",
+    )
+
+    parser.add_argument(
+        "--workers",
+        default=1,
+        type=int,
+        metavar="N",
+        help="""Reconcile this many export files at the same time.
+            (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        default="output",
+        type=Path,
+        metavar="DIR",
+        help="""Put the expedition folders in this directory.
+            (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "--help-pdf",
+        default=HELP_PDF,
+        type=Path,
+        metavar="PATH",
+        help="""Copy this help file into every expedition folder.
+            (default: %(default)s)""",
+    )
+
+    args = parser.parse_args(argv)
+
+    single = [args.workflow_id, args.rename_to, args.export]
+    if args.manifest and any(single):
+        parser.error("Use either --manifest or -w, -r, & -e, not both.")
+
+    if not args.manifest and not all(single):
+        parser.error("Arguments: -w, -r, & -e are required without a --manifest.")
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1.")
+
+    return args
+
+
+def attach_args(argv: list[str]) -> list[str]:
+    """Attach the -a value to the flag, it often starts with a dash like "-a -e"."""
+    attached = []
+    for arg in argv:
+        if attached and attached[-1] in ("-a", "--args"):
+            flag = attached.pop()
+            arg = f"{flag}={arg}" if flag == "--args" else f"{flag}{arg}"
+        attached.append(arg)
+    return attached
+
+
+def read_manifest(path) -> list[Entry]:
+    with open(path, newline="") as in_file:
+        rows = list(csv.DictReader(in_file))
+
+    entries = []
+    for i, row in enumerate(rows, 2):
+        row = {k.strip(): v.strip() for k, v in row.items() if k and v}
+        if missing := [c for c in MANIFEST_COLUMNS[:3] if not row.get(c)]:
+            raise utils.ReconcileError(
+                f"Manifest line {i} is missing: {', '.join(missing)}."
+            )
+        row = {k: v for k, v in row.items() if k in MANIFEST_COLUMNS}
+        entries.append(Entry(**row))
+    return entries
+
+
+def output_paths(entry: Entry, version: str, output_dir: Path) -> dict[str, Path]:
+    """Get the same folder and file names that nfn_export.bash used."""
+    dir_ = output_dir / entry.prefix
+    return {
+        "dir": dir_,
+        "raw": dir_ / f"{entry.prefix}.raw_transcripts.{version}.csv",
+        "reconciled": dir_ / f"{entry.prefix}.reconciled.{version}.csv",
+        "summary": dir_ / f"{entry.prefix}.summary.{version}.html",
+        "unreconciled": dir_ / f"{entry.prefix}.unreconciled.{version}.csv",
+    }
+
+
+def run_export(entries: list[Entry], version, output_dir, help_pdf) -> list[str]:
+    """Reconcile all of the expeditions in one export file.
+
+    The export is parsed once and every expedition takes its workflow from it.
+    This returns the errors for each expedition, empty if it worked.
+    """
+    import pandas as pd  # Only import the heavy modules in the worker
+
+    try:
+        df = pd.read_csv(entries[0].export, dtype=str)
+    except Exception:  # pylint: disable=broad-except
+        return [traceback.format_exc()] * len(entries)
+
+    errors = []
+    for entry in entries:
+        try:
+            paths = output_paths(entry, version, output_dir)
+            paths["dir"].mkdir(parents=True, exist_ok=True)
+
+            shutil.copyfile(entry.export, paths["raw"])
+            if help_pdf.exists():
+                shutil.copy(help_pdf, paths["dir"])
+
+            argv = shlex.split(entry.args) + ["-w", entry.workflow_id]
+            for key in ("unreconciled", "reconciled", "summary"):
+                argv += [f"--{key}", str(paths[key])]
+            argv.append(str(paths["raw"]))
+
+            reconcile.run(reconcile.parse_args(argv), df=df)
+
+            if entry.copy_to:
+                copy_dir(paths["dir"], Path(entry.copy_to))
+
+            errors.append("")
+
+        except utils.ReconcileError as err:
+            errors.append(str(err))
+        except SystemExit as err:
+            errors.append(f"reconcile.py exited with {err.code}")
+        except Exception:  # pylint: disable=broad-except
+            errors.append(traceback.format_exc())
+
+    return errors
+
+
+def copy_dir(src: Path, copy_to: Path) -> None:
+    """Copy the folder like "cp -r" does."""
+    dst = copy_to / src.name if copy_to.is_dir() else copy_to
+    shutil.copytree(src, dst, dirs_exist_ok=True)
+
+
+def run_batch(entries, version, output_dir, help_pdf, workers=1) -> int:
+    """Reconcile the expeditions and get how many of them failed."""
+    by_export = defaultdict(list)
+    for entry in entries:
+        by_export[str(Path(entry.export).resolve())].append(entry)
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(run_export, group, version, output_dir, help_pdf): group
+            for group in by_export.values()
+        }
+        for future, group in futures.items():
+            for entry, error in zip(group, future.result()):
+                print()
+                print(f"Workflow:           {entry.workflow_id}")
+                print(f"Version:            v{version}")
+                print(f"Name of Folder:     {entry.prefix}")
+                if error:
+                    failures += 1
+                    print(error.rstrip(), file=sys.stderr)
+
+    return failures
+
+
+def main():
+    args = parse_args()
+
+    try:
+        if args.manifest:
+            entries = read_manifest(args.manifest)
+        else:
+            entries = [
+                Entry(
+                    export=args.export,
+                    workflow_id=args.workflow_id,
+                    name=args.rename_to,
+                    args=args.args,
+                    copy_to=args.copy_to,
+                )
+            ]
+    except utils.ReconcileError as err:
+        utils.error_exit(str(err))
+
+    failures = run_batch(
+        entries, args.version, args.output_dir, args.help_pdf, args.workers
+    )
+
+    if failures:
+        utils.error_exit(f"{failures} of {len(entries)} expeditions failed.")
+
+
+if __name__ == "__main__":
+    main()
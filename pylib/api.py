@@ -0,0 +1,88 @@
+"""Reconcile classifications from Python instead of the command line.
+
+The jobs take an Options object instead of parsed arguments. Each job works on
+its own copy of the options and its own tables, so a warm interpreter can run
+many jobs, even at the same time in threads. The fuzzy match score cache is shared
+by all jobs because the scores only depend on the strings.
+
+    result = reconcile_file("classifications.csv", Options(workflow_id=1234))
+    df = result.reconciled_df(explanations=True)
+"""
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import pandas as pd
+
+from pylib import utils
+from pylib.options import Options
+from pylib.table import Table
+
+
+@dataclass(kw_only=True)
+class Reconciliation:
+    options: Options
+    unreconciled: Table
+    reconciled: Table
+
+    # The tables keep their data frames for the output files, so we return copies
+
+    def unreconciled_df(self) -> pd.DataFrame:
+        return self.unreconciled.to_df(self.options).copy()
+
+    def reconciled_df(self, explanations=False) -> pd.DataFrame:
+        return self.reconciled.to_df(self.options, explanations).copy()
+
+    def write(
+        self, unreconciled=None, reconciled=None, summary=None, explanations=False
+    ):
+        """Write the same output files as reconcile.py."""
+        if unreconciled:
+            self.unreconciled.to_csv(self.options, unreconciled)
+
+        if reconciled:
+            self.reconciled.to_csv(self.options, reconciled, explanations)
+
+        if summary:
+            from pylib import summary as summary_report
+
+            summary_report.report(
+                self.options, self.unreconciled, self.reconciled, summary
+            )
+
+
+def read_table(args, df=None) -> Table:
+    """Parse the input file, or a data frame of its contents, into a table."""
+    reader = utils.get_plugins("formats")[f"{args.format}_format"]
+    table = reader.read(args) if df is None else reader.read_df(args, df)
+    if len(table) == 0:
+        raise utils.ReconcileError(f"Workflow {args.workflow_id} has no data.")
+    return table
+
+
+def reconcile_dataframe(df: pd.DataFrame, options: Options = None) -> Reconciliation:
+    """Reconcile a data frame with the contents of an input file.
+
+    The values should be strings, like pd.read_csv(path, dtype=str) gives.
+    """
+    options = job_options(options)
+    return reconcile_table(options, read_table(options, df.copy()))
+
+
+def reconcile_file(input_file, options: Options = None) -> Reconciliation:
+    options = job_options(options, input_file=str(Path(input_file)))
+    return reconcile_table(options, read_table(options))
+
+
+def job_options(options: Options = None, **changes) -> Options:
+    """Copy the options so that a job can not change the caller's options."""
+    options = replace(options if options else Options(), **changes)
+    options.validate()
+    return options
+
+
+def reconcile_table(options: Options, unreconciled: Table) -> Reconciliation:
+    return Reconciliation(
+        options=options,
+        unreconciled=unreconciled,
+        reconciled=unreconciled.reconcile(options),
+    )
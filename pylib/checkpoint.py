@@ -0,0 +1,63 @@
+"""Save reconciled subjects as we go so an interrupted run can resume.
+
+The checkpoint file is a stream of pickled (key, result) records. We append
+records in batches and sync them to disk. A partly written record at the end of
+the file, from a crash, is dropped when resuming.
+"""
+import os
+import pickle
+
+from pylib.result_cache import ResultCache
+from pylib.row import Row
+
+
+class Checkpoint(ResultCache):
+    def __init__(self, args):
+        self.log = None
+        self.pending = 0
+        self.every = getattr(args, "checkpoint_every", 100)
+        super().__init__(args)
+
+    def open(self, args):
+        path = getattr(args, "checkpoint", None)
+        if not path:
+            return None
+
+        store = {}
+        good = 0
+
+        if getattr(args, "resume", False) and os.path.exists(path):
+            with open(path, "rb") as in_file:
+                while True:
+                    try:
+                        key, hit = pickle.load(in_file)
+                    except (EOFError, pickle.UnpicklingError, ValueError):
+                        break
+                    store[key] = hit
+                    good = in_file.tell()
+
+        self.log = open(path, "r+b" if good else "wb")  # noqa
+        self.log.truncate(good)
+        self.log.seek(good)
+
+        return store
+
+    def close(self):
+        if self.log is not None:
+            self.sync()
+            self.log.close()
+            self.log = None
+        self.store = None
+
+    def put(self, key: str, row_group: list[Row], new_row: Row) -> None:
+        if self.log is None:
+            return
+        pickle.dump((key, (new_row, self.suffixes(row_group))), self.log)
+        self.pending += 1
+        if self.pending >= self.every:
+            self.sync()
+
+    def sync(self):
+        self.log.flush()
+        os.fsync(self.log.fileno())
+        self.pending = 0
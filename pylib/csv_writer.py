@@ -0,0 +1,65 @@
+"""Write a table straight to a CSV file without building a data frame.
+
+The file is the same as the one pandas writes for Table.to_df(). The header is
+every column in the order that the rows first use them, so we look at the rows
+once to get the header & column types and then write the rows. The types matter
+because pandas turns a column of numbers with blanks into floats: 5 -> 5.0.
+"""
+import csv
+import math
+import os
+from collections import Counter
+from collections import defaultdict
+from numbers import Integral
+from numbers import Real
+
+
+def is_number(type_) -> bool:
+    return issubclass(type_, Real) and not issubclass(type_, bool)
+
+
+def as_float(types: set[type], count: int, row_count: int) -> bool:
+    """Does pandas store a column with these value types as floats?"""
+    missing = count < row_count or type(None) in types
+    types = types - {type(None)}
+    return bool(types) and all(is_number(t) for t in types) and (
+        missing or any(not issubclass(t, Integral) for t in types)
+    )
+
+
+def format_value(value, float_) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if float_:
+        return repr(float(value))
+    return value if isinstance(value, str) else str(value)
+
+
+def write(table, args, path, add_note=False) -> None:
+    """Write the table like Table.to_df(args, add_note).to_csv(path, index=False)."""
+    counts = Counter()
+    types = defaultdict(set)
+    for row in table.rows:
+        row_dict = row.to_dict(add_note, table.reconciled)
+        counts.update(row_dict.keys())
+        for key, value in row_dict.items():
+            types[key].add(type(value))
+
+    headers = table.field_order(list(counts), args)
+    row_count = len(table.rows)
+    specs = [
+        (h, types[h] == {str}, as_float(types[h], counts[h], row_count))
+        for h in headers
+    ]
+
+    with open(path, "w", newline="", encoding="utf-8") as out_file:
+        writer = csv.writer(out_file, lineterminator=os.linesep)
+        writer.writerow(headers)
+        for row in table.rows:
+            row_dict = row.to_dict(add_note, table.reconciled)
+            writer.writerow(
+                [
+                    row_dict.get(h, "") if strings else format_value(row_dict.get(h), f)
+                    for h, strings, f in specs
+                ]
+            )
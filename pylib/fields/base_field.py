@@ -34,7 +34,7 @@ class BaseField:
         return header
 
     def decorate_dict(self, field_dict: dict[str, Any]) -> dict[str, Any]:
-        field_dict[self.header("Explanation")] = self.note
+        field_dict[self.header("Explanation")] = str(self.note)
         return field_dict
 
     @classmethod
@@ -1,10 +1,15 @@
 from dataclasses import dataclass
-from statistics import mean
 from typing import Any
 
+from pylib.fields import segments
 from pylib.fields.base_field import BaseField
+from pylib.fields.clusters import cluster_flag
+from pylib.fields.clusters import cluster_note
+from pylib.fields.clusters import mark_clusters
 from pylib.flag import Flag
-from pylib.utils import P
+from pylib.note import Note
+
+SIDES = ["left", "right", "top", "bottom"]
 
 
 @dataclass(kw_only=True)
@@ -25,16 +30,43 @@ class BoxField(BaseField):
 
     @classmethod
     def reconcile(cls, group, row_count, args=None):
-        use = [g for g in group if g is not None]
-
-        note = f"There {P('is', row_count)} {row_count} box {P('record', row_count)}"
-
-        return cls.like(
-            group,
-            note=note,
-            flag=Flag.OK,
-            left=round(mean(b.left for b in use)),
-            right=round(mean(b.right for b in use)),
-            top=round(mean(b.top for b in use)),
-            bottom=round(mean(b.bottom for b in use)),
-        )
+        return cls.reconcile_batch([group], [row_count], args)[0]
+
+    @classmethod
+    def reconcile_batch(cls, groups, row_counts, args=None):
+        """Reconcile the box groups for many subjects at once."""
+        uses = [[g for g in group if g is not None] for group in groups]
+        values, offsets = segments.pack(uses, SIDES)
+        boxes = segments.rounded_means(values, offsets)
+
+        reconciled = []
+        for group, row_count, box in zip(groups, row_counts, boxes):
+            note = Note("There {0:is} {0} box {0:record}", row_count)
+            reconciled.append(
+                cls.like(group, note=note, flag=Flag.OK, **dict(zip(SIDES, box)))
+            )
+        return reconciled
+
+    @classmethod
+    def reconcile_clusters(cls, group, row_count, args=None):
+        """Reconcile one box for each cluster of box centers in a group of rows."""
+        clusters = mark_clusters(group, center, args.cluster_marks)
+        if not clusters:
+            return None
+
+        values, offsets = segments.pack([[m for _, m in c] for c in clusters], SIDES)
+        boxes = segments.rounded_means(values, offsets)
+
+        return [
+            cls.like(
+                marks[0][1],
+                note=cluster_note("box", marks, row_count),
+                flag=cluster_flag(marks),
+                **dict(zip(SIDES, box)),
+            )
+            for marks, box in zip(clusters, boxes)
+        ]
+
+
+def center(box: BoxField) -> tuple[float, float]:
+    return (box.left + box.right) / 2, (box.top + box.bottom) / 2
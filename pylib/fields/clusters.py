@@ -0,0 +1,75 @@
+"""Group marks on a subject by how close they are to each other.
+
+When volunteers mark several specimens on a sheet the marks for one specimen may
+end up in different columns. So instead of averaging each column we link every
+pair of marks that are within a distance of each other and each connected group
+of marks is a cluster. A grid with cells as wide as the distance is the spatial
+index: marks can only be linked to marks in their own or a neighboring cell. This
+keeps the clustering near-linear in the number of marks.
+"""
+import math
+from collections import defaultdict
+
+from pylib.flag import Flag
+from pylib.note import Note
+
+
+def cluster(points: list[tuple[float, float]], distance: float) -> list[list[int]]:
+    """Get the indexes of the points in each cluster.
+
+    Clusters are in the order of their first point and so are the points in them.
+    """
+    parents = list(range(len(points)))
+
+    def find(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    grid = defaultdict(list)
+    for i, (x, y) in enumerate(points):
+        cell_x, cell_y = math.floor(x / distance), math.floor(y / distance)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in grid.get((cell_x + dx, cell_y + dy), []):
+                    x2, y2 = points[j]
+                    if math.hypot(x - x2, y - y2) <= distance:
+                        root_i, root_j = find(i), find(j)
+                        if root_i != root_j:
+                            parents[max(root_i, root_j)] = min(root_i, root_j)
+        grid[cell_x, cell_y].append(i)
+
+    clusters = defaultdict(list)
+    for i in range(len(points)):
+        clusters[find(i)].append(i)
+
+    return list(clusters.values())
+
+
+def mark_clusters(group, center, distance) -> list[list[tuple[int, object]]]:
+    """Cluster the marks in a group of rows.
+
+    The group has a list of marks for each row and center() gets a mark's (x, y)
+    position. Returns the (row index, mark) pairs in each cluster.
+    """
+    marks = [(r, m) for r, row in enumerate(group) for m in row]
+    indexes = cluster([center(m) for _, m in marks], distance)
+    return [[marks[i] for i in c] for c in indexes]
+
+
+def cluster_note(kind: str, marks, row_count: int) -> Note:
+    count = len(marks)
+    records = len({r for r, _ in marks})
+    return Note(
+        "Cluster of {0} {1} {0:mark} from {2} of {3} {3:record}",
+        count,
+        kind,
+        records,
+        row_count,
+    )
+
+
+def cluster_flag(marks) -> Flag:
+    """A cluster that only one volunteer marked needs checking."""
+    return Flag.OK if len({r for r, _ in marks}) > 1 else Flag.ONLY_ONE
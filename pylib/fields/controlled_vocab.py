@@ -1,69 +1,210 @@
+"""Reconcile fields where the volunteers choose from a list of values.
+
+controlled_vocab() reconciles one column for one subject. batch_controlled_vocab()
+reconciles many columns for many subjects at once. It counts the values in one
+vectorized pass over all of the fields and then flags and notes the results the
+same way.
+"""
 from collections import defaultdict
 
+import numpy as np
+import pandas as pd
+
 from pylib.flag import Flag
-from pylib.utils import P
+from pylib.note import Note
 
 PLACEHOLDERS = ["placeholder"]
 
 
+def is_filled(field) -> bool:
+    return bool(
+        field
+        and field.value
+        and field.value.strip()
+        and field.value.lower not in PLACEHOLDERS
+    )
+
+
 def controlled_vocab(cls, group, row_count):
-    filled = [
-        f for f in group
-        if f and f.value and f.value.strip() and f.value.lower not in PLACEHOLDERS
-    ]
-    count = len(filled)
-    blanks = row_count - count
+    filled = [f for f in group if is_filled(f)]
 
     by_value = defaultdict(list)
     for field in filled:
         by_value[field.value].append(field)
     counters = sorted(by_value.values(), key=lambda v: -len(v))
 
-    match counters:
+    top_count = len(counters[0]) if counters else 0
+    next_count = len(counters[1]) if len(counters) > 1 else 0
+    flag = vocab_flag(row_count, len(counters), top_count, next_count)
+
+    top = counters[0][0] if counters else None
+    return vocab_field(
+        cls, group, top, flag, row_count, len(filled), top_count, next_count
+    )
+
+
+def vocab_flag(row_count, distinct, top_count, next_count) -> Flag:
+    match distinct, top_count, next_count:
         # Nobody chose a value
-        case []:
-            note = (
-                f"All {row_count} {P('record', row_count)} {P('is', row_count)} blank"
-            )
-            return cls.like(group, note=note, flag=Flag.ALL_BLANK)
+        case 0, _, _:
+            return Flag.ALL_BLANK
 
         # Everyone chose the same value
-        case [c0] if len(c0) > 1 and len(c0) == row_count:
-            note = (
-                f"Unanimous match, {len(c0)} of {row_count} {P('record', row_count)} "
-                f"{blanks} {P('blank', blanks)}"
+        case 1, c0, _ if c0 > 1 and c0 == row_count:
+            return Flag.UNANIMOUS
+
+        # It was a tie for the values chosen or we have a winner
+        case _, c0, _ if c0 > 1:
+            return Flag.MAJORITY
+
+        # Only one person chose a value
+        case 1, _, _:
+            return Flag.ONLY_ONE
+
+        # Everyone picked a different value
+        case _:
+            return Flag.NO_MATCH
+
+
+def vocab_flags(row_count, distinct, top_count, next_count) -> np.ndarray:
+    """Get the vocab_flag() for arrays of counts."""
+    return np.select(
+        [
+            distinct == 0,
+            (distinct == 1) & (top_count > 1) & (top_count == row_count),
+            top_count > 1,
+            distinct == 1,
+        ],
+        [Flag.ALL_BLANK, Flag.UNANIMOUS, Flag.MAJORITY, Flag.ONLY_ONE],
+        default=Flag.NO_MATCH,
+    )
+
+
+def vocab_field(cls, group, top, flag, row_count, count, top_count, next_count=0):
+    """Build the reconciled field from the flag and counts.
+
+    The top field is the first one with the most common value.
+    """
+    blanks = row_count - count
+
+    match flag:
+        case Flag.ALL_BLANK:
+            note = Note("All {0} {0:record} {0:is} blank", row_count)
+            return cls.like(group, note=note, flag=flag)
+
+        case Flag.UNANIMOUS:
+            note = Note(
+                "Unanimous match, {0} of {1} {1:record} {2} {2:blank}",
+                top_count,
+                row_count,
+                blanks,
             )
-            return cls.like(c0, note=note, value=c0[0].value, flag=Flag.UNANIMOUS)
-
-        # It was a tie for the values chosen
-        case [c0, c1, *_] if len(c0) > 1 and len(c0) == len(c1):
-            note = (
-                f"Match is a tie, {len(c0)} "
-                f"of {row_count} {P('record', row_count)} with "
-                f"{blanks} {P('blank', blanks)}"
+
+        case Flag.MAJORITY if top_count == next_count:
+            note = Note(
+                "Match is a tie, {0} of {1} {1:record} with {2} {2:blank}",
+                top_count,
+                row_count,
+                blanks,
             )
-            return cls.like(c0, note=note, value=c0[0].value, flag=Flag.MAJORITY)
 
-        # We have a winner
-        case [c0, *_] if len(c0) > 1:
-            note = (
-                f"Match {len(c0)} of {row_count} {P('record', row_count)} "
-                f"with {blanks} {P('blank', blanks)}"
+        case Flag.MAJORITY:
+            note = Note(
+                "Match {0} of {1} {1:record} with {2} {2:blank}",
+                top_count,
+                row_count,
+                blanks,
             )
-            return cls.like(c0, note=note, value=c0[0].value, flag=Flag.MAJORITY)
 
-        # Only one person chose a value
-        case [c0] if len(c0) == 1:
-            note = (
-                f"Only 1 transcript in {row_count} {P('record', row_count)} "
-                f"with {blanks} {P('blank', blanks)}"
+        case Flag.ONLY_ONE:
+            note = Note(
+                "Only 1 transcript in {0} {0:record} with {1} {1:blank}",
+                row_count,
+                blanks,
             )
-            return cls.like(c0, note=note, value=c0[0].value, flag=Flag.ONLY_ONE)
 
-        # Everyone picked a different value
-        case [c0, *_] if len(c0) == 1:
-            note = (
-                f"No match on {row_count} {P('record', row_count)} "
-                f"with {blanks} {P('blank', blanks)}"
+        case _:
+            note = Note(
+                "No match on {0} {0:record} with {1} {1:blank}", row_count, blanks
             )
-            return cls.like(c0, note=note, flag=Flag.NO_MATCH, value=c0[0].value)
+
+    return cls.like(top, note=note, value=top.value, flag=flag)
+
+
+def batch_controlled_vocab(columns, row_groups) -> list[dict]:
+    """Reconcile controlled vocabulary columns for many subjects at once.
+
+    columns maps field names to the field classes that reconcile them. Returns a
+    dict of reconciled fields for each row group. Columns that are missing from
+    every row in a group are left out.
+    """
+    names = list(columns)
+    width = len(names)
+
+    keys, values, fields = [], [], []
+    groups = {}  # The first field in each (subject, column) group, even if blank
+    for g, row_group in enumerate(row_groups):
+        for c, name in enumerate(names):
+            key = g * width + c
+            for row in row_group:
+                if (field := row.fields.get(name)) is None:
+                    continue
+                groups.setdefault(key, field)
+                if is_filled(field):
+                    keys.append(key)
+                    values.append(field.value)
+                    fields.append(field)
+
+    key_count = len(row_groups) * width
+    keys = np.array(keys, dtype=np.int64)
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+
+    # Count each value in each group & find where it first appears
+    pairs = keys * max(len(uniques), 1) + codes
+    pairs, firsts, counts = np.unique(pairs, return_index=True, return_counts=True)
+    pair_keys = keys[firsts]
+
+    # Order the values in each group by count, then by first appearance
+    order = np.lexsort((firsts, -counts, pair_keys))
+    pair_keys, firsts, counts = pair_keys[order], firsts[order], counts[order]
+
+    starts = np.flatnonzero(np.diff(pair_keys, prepend=-1))
+    sizes = np.diff(np.append(starts, len(pair_keys)))
+    distinct = np.zeros(key_count, dtype=np.int64)
+    top_count = np.zeros(key_count, dtype=np.int64)
+    next_count = np.zeros(key_count, dtype=np.int64)
+    top_index = np.full(key_count, -1, dtype=np.int64)
+
+    group_keys = pair_keys[starts]
+    distinct[group_keys] = sizes
+    top_count[group_keys] = counts[starts]
+    top_index[group_keys] = firsts[starts]
+    has_next = sizes > 1
+    next_count[group_keys[has_next]] = counts[starts[has_next] + 1]
+
+    filled = np.bincount(keys, minlength=key_count)
+    row_counts = np.repeat([len(g) for g in row_groups], width)
+    flags = vocab_flags(row_counts, distinct, top_count, next_count)
+
+    # Python scalars are much faster than numpy ones in the loop below
+    flags = [Flag(f) for f in flags.tolist()]
+    row_counts, filled = row_counts.tolist(), filled.tolist()
+    top_count, next_count = top_count.tolist(), next_count.tolist()
+    top_index = top_index.tolist()
+
+    results = [{} for _ in row_groups]
+    for key, first in groups.items():
+        g, c = divmod(key, width)
+        top = fields[top_index[key]] if top_index[key] >= 0 else None
+        results[g][names[c]] = vocab_field(
+            columns[names[c]],
+            first,
+            top,
+            flags[key],
+            row_counts[key],
+            filled[key],
+            top_count[key],
+            next_count[key],
+        )
+
+    return results
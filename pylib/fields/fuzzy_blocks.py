@@ -0,0 +1,121 @@
+"""Pick candidate pairs of strings for fuzzy matching in large groups.
+
+Scoring every pair in a group is quadratic. For large groups we only score two
+kinds of pairs:
+    look-alikes: MinHash signatures of each string's character 3-grams put
+                 strings that share most of their 3-grams in the same locality
+                 sensitive hashing (LSH) bucket.
+    containment: A string inside another one or a string whose words are all in
+                 another one. The partial ratio and the token set ratio score
+                 these pairs 100 even when their 3-grams are far apart.
+
+Tolerance: This is not exhaustive and blocking is off by default. Every pair that
+scores 100 is found, so when a group has one the results are the same as scoring
+every pair. Other pairs are only found by their 3-grams. Two strings whose 3-gram
+sets have a Jaccard similarity of s become a candidate pair with a probability of
+1 - (1 - s^ROWS)^BANDS. That is over 99% for s >= 0.5, about 85% for s = 0.3, and
+about 56% for s = 0.2. The partial ratio of a short string against a long one can
+be high while their Jaccard similarity is low, so below 100 a different, lower
+scoring pair may win, or none at all. The hashes are fixed so the results are the
+same on every run.
+"""
+import random
+import zlib
+from collections import defaultdict
+from itertools import combinations
+
+import numpy as np
+from fuzzywuzzy import utils as fuzz_utils  # pylint: disable=import-error
+
+from pylib import options
+
+BLOCK_SIZE = options.FUZZY_BLOCK_SIZE  # Only use blocking for groups larger than this
+
+BANDS = 20
+ROWS = 2
+GRAM = 3
+
+PRIME = (1 << 31) - 1
+RANDOM = random.Random(1031)
+HASH_A = np.array([RANDOM.randrange(1, PRIME) for _ in range(BANDS * ROWS)])
+HASH_B = np.array([RANDOM.randrange(0, PRIME) for _ in range(BANDS * ROWS)])
+
+
+def candidate_pairs(values: list[str], args=None) -> list[tuple[int, int]]:
+    """Get the pairs of indexes to score in itertools.combinations order."""
+    count = len(values)
+    size = getattr(args, "fuzzy_block_size", BLOCK_SIZE)
+    backend = getattr(args, "fuzzy_backend", "fuzzywuzzy")
+
+    # rapidfuzz scores the whole group at once so there is nothing to save
+    if not size or count <= size or backend == "rapidfuzz":
+        return list(combinations(range(count), 2))
+
+    pairs = look_alike_pairs(values) | contained_pairs(values)
+    return sorted(pairs)
+
+
+def look_alike_pairs(values: list[str]) -> set[tuple[int, int]]:
+    buckets = defaultdict(list)
+    for i, signature in enumerate(minhash(v) for v in values):
+        for band in range(BANDS):
+            key = (band, *signature[band * ROWS : (band + 1) * ROWS])
+            buckets[key].append(i)
+
+    pairs = set()
+    for members in buckets.values():
+        pairs.update(combinations(members, 2))
+    return pairs
+
+
+def contained_pairs(values: list[str]) -> set[tuple[int, int]]:
+    """Get the pairs where one string holds the other's text or all of its words.
+
+    A string that holds another one also holds the other's rarest 3-gram and word,
+    so we only check the strings that have those.
+    """
+    texts = [normalize(v) for v in values]
+    words = [set(fuzz_utils.full_process(v, force_ascii=True).split()) for v in values]
+    text_grams = [grams(t) for t in texts]
+
+    by_gram, by_word = defaultdict(set), defaultdict(set)
+    for i, (gram_set, word_set) in enumerate(zip(text_grams, words)):
+        for gram in gram_set:
+            by_gram[gram].add(i)
+        for word in word_set:
+            by_word[word].add(i)
+
+    pairs = set()
+    for i, text in enumerate(texts):
+        if text:
+            # A string shorter than a gram has no 3-grams of its own to look up
+            if len(text) < GRAM:
+                others = range(len(texts))
+            else:
+                others = by_gram[min(text_grams[i], key=lambda g: len(by_gram[g]))]
+            pairs.update((min(i, j), max(i, j)) for j in others if text in texts[j])
+
+        if words[i]:
+            rarest = min(words[i], key=lambda w: len(by_word[w]))
+            pairs.update(
+                (min(i, j), max(i, j)) for j in by_word[rarest] if words[i] <= words[j]
+            )
+
+    return {(i, j) for i, j in pairs if i != j}
+
+
+def normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def grams(text: str) -> set[str]:
+    return {text[i : i + GRAM] for i in range(max(1, len(text) - GRAM + 1))}
+
+
+def minhash(value: str) -> list[int]:
+    hashes = np.array(
+        [zlib.crc32(g.encode("utf-8")) for g in grams(normalize(value))],
+        dtype=np.int64,
+    )
+    signature = (np.outer(HASH_A, hashes) + HASH_B[:, None]) % PRIME
+    return signature.min(axis=1).tolist()
@@ -0,0 +1,171 @@
+"""Score every pair of strings in a group with a fuzzy matcher in one call.
+
+There are two backends:
+    fuzzywuzzy: The default. Scores each distinct pair of strings once.
+    rapidfuzz:  Optional. Scores all distinct strings at once with rapidfuzz's
+                cdist and it can use several threads. Its token set ratio scores
+                are the same as fuzzywuzzy's, but its partial ratio finds the
+                optimal alignment so those scores may be a bit higher.
+
+Volunteers type the same strings over and over across subjects, so the fuzzywuzzy
+backend keeps pair scores in a bounded LRU cache shared by all subjects. Token
+set ratios only depend on the processed strings so they are cached by those.
+
+When only the best score matters we can skip pairs that cannot beat it. See
+bounded_scores() for cheap upper bounds on the fuzzywuzzy partial ratio. Large
+groups only score the candidate pairs from fuzzy_blocks.candidate_pairs().
+"""
+import functools
+import math
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+from fuzzywuzzy import fuzz  # pylint: disable=import-error
+from fuzzywuzzy import utils as fuzz_utils  # pylint: disable=import-error
+
+from pylib import options
+
+PARTIAL_RATIO = "partial_ratio"
+TOKEN_SET_RATIO = "token_set_ratio"
+
+BACKENDS = options.FUZZY_BACKENDS
+HAS_RAPIDFUZZ = options.has_module("rapidfuzz")
+
+FUZZYWUZZY = {
+    PARTIAL_RATIO: fuzz.partial_ratio,
+    TOKEN_SET_RATIO: fuzz.token_set_ratio,
+}
+
+CACHE_SIZE = options.FUZZY_CACHE_SIZE
+
+
+def pair_score(scorer: str, value_1: str, value_2: str) -> int:
+    return FUZZYWUZZY[scorer](value_1, value_2)
+
+
+cached_pair_score = functools.lru_cache(maxsize=CACHE_SIZE)(pair_score)
+
+
+def set_cache_size(size: int) -> None:
+    """Replace the pair score cache with an empty one if its size changes.
+
+    The cache is shared by every job in the process, so only call this when the
+    process starts, before any jobs are running.
+    """
+    global cached_pair_score
+    if cached_pair_score.cache_parameters()["maxsize"] != size:
+        cached_pair_score = functools.lru_cache(maxsize=size)(pair_score)
+
+
+def cache_stats() -> str:
+    info = cached_pair_score.cache_info()
+    total = info.hits + info.misses
+    rate = info.hits / total if total else 0.0
+    return (
+        f"Fuzzy score cache: {info.hits:,} hits, {info.misses:,} misses, "
+        f"{rate:.1%} hit rate, {info.currsize:,} of {info.maxsize:,} entries used"
+    )
+
+
+def score_pairs(values: list[str], scorer: str, args=None, pairs=None) -> dict:
+    """Get the scores for pairs of values.
+
+    The score for values[i] and values[j] is in scores[i, j] where i < j. This
+    is the same as comparing the values in itertools.combinations order. If given
+    a list of (i, j) pairs then only those pairs are scored.
+    """
+    backend = getattr(args, "fuzzy_backend", "fuzzywuzzy")
+    pairs = combinations(range(len(values)), 2) if pairs is None else pairs
+
+    # Identical values, like blanks, only get scored once
+    index = {}
+    inverse = [index.setdefault(v, len(index)) for v in values]
+    uniques = list(index)
+
+    if backend == "rapidfuzz":
+        workers = getattr(args, "fuzzy_workers", 1)
+        scores = rapidfuzz_matrix(uniques, scorer, workers).tolist()
+        return {(i, j): scores[inverse[i]][inverse[j]] for i, j in pairs}
+
+    return fuzzywuzzy_scores(uniques, inverse, scorer, pairs)
+
+
+def bounded_scores(values: list[str], scorer: str, args=None, pairs=None):
+    """Get upper bounds for the pair scores and a function for the actual scores.
+
+    The bounds are keyed like the scores from score_pairs(). Calculating the actual
+    score for a pair is expensive so only do it when the bound is promising.
+    """
+    backend = getattr(args, "fuzzy_backend", "fuzzywuzzy")
+
+    if backend == "rapidfuzz" or scorer != PARTIAL_RATIO:
+        scores = score_pairs(values, scorer, args, pairs)
+        return scores, lambda i, j: scores[i, j]
+
+    bounds = partial_ratio_bounds(values, pairs)
+    return bounds, lambda i, j: cached_pair_score(scorer, values[i], values[j])
+
+
+def partial_ratio_bounds(values: list[str], pairs=None) -> dict:
+    """Get upper bounds for fuzzywuzzy's partial ratios from character counts.
+
+    The partial ratio compares the shorter string (length m) with substrings of
+    the longer one. The substrings are at most m characters long, but they can be
+    cut off at the end of the longer string. If the strings share h characters,
+    counting repeats, then the best ratio is 2h / (m + h). Note h <= m so this also
+    covers the length limit. The bounds are keyed by their (i, j) pairs.
+    """
+    counts = {v: Counter(v) for v in values}
+
+    bounds = {}
+    pairs = combinations(range(len(values)), 2) if pairs is None else pairs
+    for i, j in pairs:
+        value_1, value_2 = values[i], values[j]
+        if value_1 == value_2:
+            bound = 100
+        elif not value_1 or not value_2:
+            bound = 0
+        else:
+            shorter = min(len(value_1), len(value_2))
+            shared = (counts[value_1] & counts[value_2]).total()
+            bound = math.ceil(100 * 2 * shared / (shorter + shared))
+        bounds[i, j] = bound
+
+    return bounds
+
+
+def fuzzywuzzy_scores(uniques, inverse, scorer, pairs) -> dict:
+    if scorer == TOKEN_SET_RATIO:
+        uniques = [fuzz_utils.full_process(u, force_ascii=True) for u in uniques]
+
+    # The scorers are not always symmetric so keep the comparison order
+    return {
+        (i, j): cached_pair_score(scorer, uniques[inverse[i]], uniques[inverse[j]])
+        for i, j in pairs
+    }
+
+
+def rapidfuzz_matrix(uniques, scorer, workers) -> np.ndarray:
+    # Only import the optional backend when it is used
+    from rapidfuzz import fuzz as rapid_fuzz  # pylint: disable=import-error
+    from rapidfuzz import process as rapid_process  # pylint: disable=import-error
+
+    if scorer == PARTIAL_RATIO:
+        scores = rapid_process.cdist(
+            uniques, uniques, scorer=rapid_fuzz.partial_ratio, workers=workers
+        )
+        scores = np.rint(scores).astype(np.int64)
+        # Mimic fuzzywuzzy: Identical strings score 100 before blanks score 0
+        empty = np.array([not u for u in uniques], dtype=bool)
+        scores[empty, :] = 0
+        scores[:, empty] = 0
+        np.fill_diagonal(scores, 100)
+        return scores
+
+    # Use fuzzywuzzy's string processing, rapidfuzz's is a bit different
+    processed = [fuzz_utils.full_process(u, force_ascii=True) for u in uniques]
+    scores = rapid_process.cdist(
+        processed, processed, scorer=rapid_fuzz.token_set_ratio, workers=workers
+    )
+    return np.rint(scores).astype(np.int64)
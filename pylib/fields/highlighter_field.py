@@ -1,12 +1,12 @@
-import re
 import sys
+from bisect import bisect_right
 from collections import defaultdict
 from dataclasses import dataclass, replace
 from typing import Any
 
 from pylib.fields.base_field import BaseField
 from pylib.flag import Flag
-from pylib.utils import P
+from pylib.note import Note
 
 
 @dataclass(kw_only=True)
@@ -111,51 +111,55 @@ class HighlightField(BaseField):
             match counters:
                 # Nobody chose a value
                 case []:
-                    note = (
-                        f"The {row_count} {P('record', row_count)} "
-                        f"{P('is', row_count)} blank"
-                    )
+                    note = Note("The {0} {0:record} {0:is} blank", row_count)
                     fields.append(cls(note=note, flag=Flag.ALL_BLANK))
 
                 # Only one selected
                 case [c0] if len(c0) == 1:
-                    note = (
-                        f"Only 1 highlight in {count} {P('record', count)} "
-                        f"with {blanks} {P('blank', blanks)}"
+                    note = Note(
+                        "Only 1 highlight in {0} {0:record} with {1} {1:blank}",
+                        count,
+                        blanks,
                     )
                     fields.append(replace(c0[0], flag=Flag.ONLY_ONE, note=note))
 
                 # Everyone chose the same value
                 case [c0] if len(c0) == count and len(c0) > 1:
-                    note = (
-                        f"Exact unanimous match, "
-                        f"{len(c0)} of {row_count} {P('record', row_count)} "
-                        f"with {blanks} {P('blank', blanks)}"
+                    note = Note(
+                        "Exact unanimous match, {0} of {1} {1:record} "
+                        "with {2} {2:blank}",
+                        len(c0),
+                        row_count,
+                        blanks,
                     )
                     fields.append(replace(c0[0], flag=Flag.UNANIMOUS, note=note))
 
                 # It was a tie for the text chosen
                 case [c0, c1, *_] if len(c0) > 1 and len(c0) == len(c1):
-                    note = (
-                        f"Match is a tie, {len(c0)} "
-                        f"of {row_count} {P('record', row_count)} "
-                        f"with {blanks} {P('blank', blanks)}"
+                    note = Note(
+                        "Match is a tie, {0} of {1} {1:record} with {2} {2:blank}",
+                        len(c0),
+                        row_count,
+                        blanks,
                     )
                     fields.append(replace(c0[0], flag=Flag.MAJORITY, note=note))
 
                 # We have a winner
                 case [c0, *_] if len(c0) > 1:
-                    note = (
-                        f"Match {len(c0)} of {row_count} {P('record', row_count)} "
-                        f"with {blanks} {P('blank', blanks)}"
+                    note = Note(
+                        "Match {0} of {1} {1:record} with {2} {2:blank}",
+                        len(c0),
+                        row_count,
+                        blanks,
                     )
                     fields.append(replace(c0[0], flag=Flag.MAJORITY, note=note))
 
                 # They're all different
                 case [c0, *_] if len(c0) == 1:
-                    note = (
-                        f"No match on {row_count} {P('record', row_count)} "
-                        f"with {blanks} {P('blank', blanks)}"
+                    note = Note(
+                        "No match on {0} {0:record} with {1} {1:blank}",
+                        row_count,
+                        blanks,
                     )
                     fields.append(replace(c0[0], flag=Flag.NO_MATCH, note=note))
 
@@ -166,49 +170,55 @@ class HighlightField(BaseField):
 
     @staticmethod
     def align_json_fields(group) -> dict[str, list["HighlightField"]]:
-        aligned = defaultdict(list)
+        """Group the highlights in each row by the contiguous span they start in.
 
+        The spans are the union of all of the highlights. We sort and merge the
+        highlight intervals and then binary search for the span of each highlight.
+        """
         all_highlights = [h for row in group for h in row]
+        contigs = HighlightField.contigs(all_highlights)
+        starts = [c[0] for c in contigs]
 
-        # Get the extremes of the highlighted field
-        start = min([h.start for h in all_highlights], default=0)
-        end = max([h.end for h in all_highlights], default=0)
-
-        # Mark where the highlights are in the string
-        hits = bytearray(end - start)
-        for hi in all_highlights:
-            for i in range(hi.start, hi.end):
-                hits[i - start] = 1
-
-        # Get all contiguous matches
-        contigs = [
-            (m.start() + start, m.end() + start) for m in re.finditer(b"(\x01+)", hits)
-        ]
-
-        for i, (start, end) in enumerate(contigs, 1):
-            for row in group:
-                parts: list[HighlightField] = [h for h in row if start <= h.start < end]
-
-                if not parts:
-                    continue
-
-                parts = sorted(parts, key=lambda p: p.start)
-
-                # Update unreconciled suffixes to match the reconciled span
-                for j, part in enumerate(parts):
-                    part.suffix = i if j == 0 else float(f"{i}.{j}")
-
-                # Add a reconciled record, one for each set of parts
-                high = HighlightField(
-                    name=parts[0].name,
-                    task_id=parts[0].task_id,
-                    start=min(p.start for p in parts),
-                    end=max(p.end for p in parts),
-                    text=" ".join(p.text for p in parts),  # TODO when strings
-                    label=parts[0].label,
-                    field_set=parts[0].field_set,
-                    suffix=i,
-                )
-                aligned[(start, end)].append(high)
+        by_contig = defaultdict(list)
+        for r, row in enumerate(group):
+            for hi in row:
+                k = bisect_right(starts, hi.start) - 1
+                if k >= 0 and hi.start < contigs[k][1]:
+                    by_contig[k, r].append(hi)
+
+        aligned = defaultdict(list)
+
+        for k, r in sorted(by_contig):
+            i = k + 1
+            parts = sorted(by_contig[k, r], key=lambda p: p.start)
+
+            # Update unreconciled suffixes to match the reconciled span
+            for j, part in enumerate(parts):
+                part.suffix = i if j == 0 else float(f"{i}.{j}")
+
+            # Add a reconciled record, one for each set of parts
+            high = HighlightField(
+                name=parts[0].name,
+                task_id=parts[0].task_id,
+                start=min(p.start for p in parts),
+                end=max(p.end for p in parts),
+                text=" ".join(p.text for p in parts),  # TODO when strings
+                label=parts[0].label,
+                field_set=parts[0].field_set,
+                suffix=i,
+            )
+            aligned[contigs[k]].append(high)
 
         return aligned
+
+    @staticmethod
+    def contigs(highlights) -> list[tuple[int, int]]:
+        """Merge the highlights into contiguous (start, end) spans."""
+        spans = sorted((h.start, h.end) for h in highlights if h.end > h.start)
+        contigs = []
+        for start, end in spans:
+            if contigs and start <= contigs[-1][1]:
+                contigs[-1][1] = max(contigs[-1][1], end)
+            else:
+                contigs.append([start, end])
+        return [(start, end) for start, end in contigs]
@@ -1,19 +1,22 @@
-import math
 import re
-import statistics as stats
 from collections import defaultdict
 from dataclasses import dataclass
 from typing import Any
 
+import numpy as np
+
+from pylib.fields import segments
 from pylib.fields.base_field import BaseField
 from pylib.flag import Flag
-from pylib.utils import P
+from pylib.note import Note
 
 SCALE_RE = re.compile(
     r"(?P<scale> [0-9.]+ ) \s* (?P<units> (mm|cm|dm|m) ) \b",
     flags=re.VERBOSE | re.IGNORECASE,
 )
 
+ENDS = ["x1", "y1", "x2", "y2"]
+
 
 @dataclass(kw_only=True)
 class LengthField(BaseField):
@@ -45,34 +48,44 @@ class LengthField(BaseField):
 
     @classmethod
     def reconcile(cls, group, row_count, _=None):
-        per_column = defaultdict(list)
-        for row in group:
-            for field in row:
-                per_column[field.field_name].append(field)
+        return cls.reconcile_batch([group], [row_count])[0]
 
-        reconciled = []
-
-        for field_name, fields in per_column.items():
-            reconciled.append(cls.reconcile_column(fields, row_count, field_name))
+    @classmethod
+    def reconcile_batch(cls, groups, row_counts, _=None):
+        """Reconcile the length field sets for many subjects at once."""
+        columns = []  # (subject, field name, fields) for each column
+        for subject, group in enumerate(groups):
+            per_column = defaultdict(list)
+            for row in group:
+                for field in row:
+                    per_column[field.field_name].append(field)
+            columns += [(subject, n, f) for n, f in per_column.items()]
+
+        values, offsets = segments.pack([c[2] for c in columns], ENDS)
+        ends = segments.rounded_means(values, offsets)
+
+        x1, y1, x2, y2 = np.array(ends, dtype=np.float64).reshape(-1, 4).T
+        pix_lens = np.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2).tolist()
+
+        reconciled = [[] for _ in groups]
+        for (subject, field_name, fields), end, pix_len in zip(
+            columns, ends, pix_lens
+        ):
+            field = cls.reconcile_column(
+                fields, row_counts[subject], field_name, end, round(pix_len, 2)
+            )
+            reconciled[subject].append(field)
 
         cls.adjust_reconciled(reconciled)
 
         return reconciled
 
     @classmethod
-    def reconcile_column(cls, group, row_count, field_name):
-        note = (
-            f'There {P("is", len(group))} {len(group)} of {row_count} '
-            f'length {P("record", row_count)}'
+    def reconcile_column(cls, group, row_count, field_name, end, pix_len):
+        note = Note(
+            "There {0:is} {0} of {1} length {1:record}", len(group), row_count
         )
 
-        x1 = round(stats.mean([ln.x1 for ln in group]))
-        y1 = round(stats.mean([ln.y1 for ln in group]))
-        x2 = round(stats.mean([ln.x2 for ln in group]))
-        y2 = round(stats.mean([ln.y2 for ln in group]))
-
-        pix_len = round(math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2), 2)
-
         if match := SCALE_RE.search(field_name):
             units = match.group("units")
             factor = float(match.group("scale")) / pix_len if pix_len != 0 else 0.0
@@ -86,25 +99,29 @@ class LengthField(BaseField):
             group,
             note=note,
             flag=Flag.OK,
-            x1=x1,
-            y1=y1,
-            x2=x2,
-            y2=y2,
             pixel_length=pix_len,
             factor=factor,
             units=units,
             is_scale=is_scale,
+            **dict(zip(ENDS, end)),
         )
 
     @staticmethod
     def adjust_reconciled(reconciled):
-        """Calculate lengths using units and pixel_lengths."""
-        ruler = next((f for f in reconciled if f.is_scale), None)
-
-        if not ruler:
-            return
-
-        for field in reconciled:
+        """Calculate lengths using units and pixel_lengths for each subject."""
+        fields, factors = [], []
+        for subject in reconciled:
+            ruler = next((f for f in subject if f.is_scale), None)
+            if not ruler:
+                continue
+            for field in subject:
+                field.units = ruler.units
+                fields.append(field)
+                factors.append(ruler.factor)
+
+        pix_lens = np.array([f.pixel_length for f in fields], dtype=np.float64)
+        lengths = (pix_lens * np.array(factors, dtype=np.float64)).tolist()
+
+        for field, length in zip(fields, lengths):
             if not field.is_scale:
-                field.length = round(field.pixel_length * ruler.factor, 2)
-            field.units = ruler.units
+                field.length = round(length, 2)
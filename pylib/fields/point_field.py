@@ -1,10 +1,15 @@
-import statistics as stats
 from dataclasses import dataclass
 from typing import Any
 
+from pylib.fields import segments
 from pylib.fields.base_field import BaseField
+from pylib.fields.clusters import cluster_flag
+from pylib.fields.clusters import cluster_note
+from pylib.fields.clusters import mark_clusters
 from pylib.flag import Flag
-from pylib.utils import P
+from pylib.note import Note
+
+XY = ["x", "y"]
 
 
 @dataclass(kw_only=True)
@@ -21,12 +26,39 @@ class PointField(BaseField):
 
     @classmethod
     def reconcile(cls, group, row_count, args=None):
-        note = (
-            f'There {P("is", len(group))} {len(group)} of {row_count}'
-            f'point {P("record", row_count)}'
-        )
+        return cls.reconcile_batch([group], [row_count], args)[0]
+
+    @classmethod
+    def reconcile_batch(cls, groups, row_counts, args=None):
+        """Reconcile the point groups for many subjects at once."""
+        values, offsets = segments.pack(groups, XY)
+        points = segments.rounded_means(values, offsets)
+
+        reconciled = []
+        for group, row_count, (x, y) in zip(groups, row_counts, points):
+            note = Note(
+                "There {0:is} {0} of {1}point {1:record}", len(group), row_count
+            )
+            reconciled.append(cls.like(group, note=note, x=x, y=y, flag=Flag.OK))
+        return reconciled
+
+    @classmethod
+    def reconcile_clusters(cls, group, row_count, args=None):
+        """Reconcile one point for each cluster of marks in a group of rows."""
+        clusters = mark_clusters(group, lambda p: (p.x, p.y), args.cluster_marks)
+        if not clusters:
+            return None
 
-        x = round(stats.mean([ln.x for ln in group]))
-        y = round(stats.mean([ln.y for ln in group]))
+        values, offsets = segments.pack([[m for _, m in c] for c in clusters], XY)
+        points = segments.rounded_means(values, offsets)
 
-        return cls.like(group, note=note, x=x, y=y, flag=Flag.OK)
+        return [
+            cls.like(
+                marks[0][1],
+                note=cluster_note("point", marks, row_count),
+                flag=cluster_flag(marks),
+                x=x,
+                y=y,
+            )
+            for marks, (x, y) in zip(clusters, points)
+        ]
@@ -3,10 +3,12 @@ from copy import deepcopy
 from dataclasses import dataclass, field
 from typing import Any
 
-from pylib.fields.base_field import BaseField
+import numpy as np
 
+from pylib.fields import polygons
+from pylib.fields.base_field import BaseField
 from pylib.flag import Flag
-from pylib.utils import P
+from pylib.note import Note
 from pylib.utils import Point
 
 
@@ -25,9 +27,28 @@ class PolygonField(BaseField):
         if not use:
             return None
 
-        note = (
-            f'There {P("is", len(use))} {len(use)} '
-            f'of {row_count} polygon {P("record", row_count)}'
+        if len(use) == 1:
+            note = Note(
+                "There {0:is} {0} of {1} polygon {1:record}", len(use), row_count
+            )
+            points = deepcopy(group[0].points)
+            return cls.like(group, note=note, flag=Flag.OK, points=points)
+
+        shapes = [np.array(g.points, dtype=np.float64) for g in use]
+        shapes = [s for s in shapes if len(s) >= 3]
+        grid = getattr(args, "polygon_grid", polygons.GRID)
+        outline = polygons.consensus(shapes, grid, len(use)) if shapes else None
+
+        if outline is None:
+            note = Note(
+                "No area is inside most of the {0} of {1} polygon {1:record}",
+                len(use),
+                row_count,
+            )
+            return cls.like(group, note=note, flag=Flag.NO_MATCH, points=[])
+
+        note = Note(
+            "Majority area of {0} of {1} polygon {1:record}", len(use), row_count
         )
-        points = deepcopy(group[0].points)
+        points = [Point(x, y) for x, y in outline.tolist()]
         return cls.like(group, note=note, flag=Flag.OK, points=points)
@@ -0,0 +1,203 @@
+"""Find the consensus of several polygons on a raster.
+
+All of the polygons for a subject are drawn on a shared coarse grid that covers
+them. The cells inside most of the polygons make the majority mask. We trace the
+outline of the mask back into a polygon and simplify away the grid's stair steps.
+The grid has at most --polygon-grid cells on a side, so the cost does not depend
+on the size of the image.
+
+Hand drawn polygons can have thousands of vertices. They are simplified when read
+so that drawing them on the grid stays cheap.
+"""
+import math
+
+import numpy as np
+
+from pylib import options
+
+GRID = options.POLYGON_GRID  # Default number of grid cells on the longest side
+MAX_VERTICES = 500  # Simplify polygons with more vertices than this when read
+TOLERANCE = 1.0  # Start simplifying with this tolerance in pixels
+
+
+def consensus(
+    polygons: list[np.ndarray], grid: int = GRID, count: int | None = None
+) -> np.ndarray | None:
+    """Get the outline of the area that is inside most of the polygons.
+
+    Each polygon is an array of (x, y) vertices. The count is the number of
+    records that the majority is out of, it defaults to the number of polygons.
+    Returns None when no area is inside most of them.
+    """
+    count = len(polygons) if count is None else count
+    points = np.concatenate(polygons)
+    low = points.min(axis=0)
+    size = points.max(axis=0) - low
+    cell = max(size.max() / grid, np.finfo(np.float64).eps)
+    cols, rows = np.maximum(np.ceil(size / cell), 1).astype(int)
+
+    # Runs add up, so one cumulative sum counts the polygons over every cell
+    total = np.zeros((rows, cols + 1), dtype=np.int32)
+    for polygon in polygons:
+        total += runs((polygon - low) / cell, rows, cols)
+    counts = np.cumsum(total, axis=1)[:, :cols]
+
+    mask = counts * 2 > count
+    if not mask.any():
+        return None
+
+    outline = trace(mask)
+    simple = simplify(outline, tolerance=1.0)  # Tolerance is in grid cells
+    if len(simple) >= 3:  # A thin area can simplify down to a line
+        outline = simple
+    return outline * cell + low
+
+
+def runs(polygon: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    """Mark where runs of cells inside the polygon start (+1) and end (-1)."""
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+
+    # Where each edge crosses the horizontal line through each row of centers
+    ys = np.arange(rows)[:, None] + 0.5
+    crosses = (y1 <= ys) != (y2 <= ys)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xs = x1 + (ys - y1) * (x2 - x1) / (y2 - y1)
+    xs = np.sort(np.where(crosses, xs, np.inf), axis=1)
+    if xs.shape[1] % 2:
+        xs = np.hstack([xs, np.full((rows, 1), np.inf)])
+
+    # Centers between each pair of crossings are inside
+    starts, ends = xs[:, 0::2], xs[:, 1::2]
+    row_ids, pairs = np.nonzero(np.isfinite(starts))
+    first = np.floor(starts[row_ids, pairs] - 0.5).astype(np.int64) + 1
+    last = np.floor(ends[row_ids, pairs] - 0.5).astype(np.int64) + 1
+
+    marks = np.zeros((rows, cols + 1), dtype=np.int32)
+    np.add.at(marks, (row_ids, np.clip(first, 0, cols)), 1)
+    np.add.at(marks, (row_ids, np.clip(last, 0, cols)), -1)
+    return marks
+
+
+def trace(mask: np.ndarray) -> np.ndarray:
+    """Get the outer boundary of the biggest area in the mask as grid corners.
+
+    Cell (row, col) covers x in [col, col + 1] and y in [row, row + 1]. Every cell
+    side between a filled and an empty cell is a boundary edge directed so the
+    filled cell is on its left. Chaining the edges gives closed loops.
+    """
+    padded = np.pad(mask, 1)
+    inner = padded[1:-1, 1:-1]
+    sides = [
+        (padded[:-2, 1:-1], (0, 0), (1, 0)),  # Bottom, when the cell below is empty
+        (padded[1:-1, 2:], (1, 0), (1, 1)),  # Right
+        (padded[2:, 1:-1], (1, 1), (0, 1)),  # Top
+        (padded[1:-1, :-2], (0, 1), (0, 0)),  # Left
+    ]
+
+    edges = {}
+    for neighbor, (sx, sy), (ex, ey) in sides:
+        rows, cols = np.nonzero(inner & ~neighbor)
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            edges.setdefault((c + sx, r + sy), []).append((c + ex, r + ey))
+
+    best, best_area = None, 0.0
+    while edges:
+        loop = chain(edges)
+        area = shoelace(loop)
+        if area > best_area:
+            best, best_area = loop, area
+
+    return np.array(drop_collinear(best), dtype=np.float64)
+
+
+def chain(edges: dict) -> list[tuple[int, int]]:
+    """Remove one closed loop of edges from the edges and return its vertices.
+
+    Where two areas touch at a corner we turn left to keep them apart.
+    """
+    start = next(iter(edges))
+    loop = [start]
+    here, came = start, None
+    while True:
+        ends = edges[here]
+        if came is None or len(ends) == 1:
+            end = ends[0]
+        else:
+            end = max(ends, key=lambda e: turn(came, here, e))
+        ends.remove(end)
+        if not ends:
+            del edges[here]
+        came, here = here, end
+        if here == start:
+            return loop
+        loop.append(here)
+
+
+def turn(came, here, end) -> int:
+    """Positive for a left turn at here, negative for a right turn."""
+    dx1, dy1 = here[0] - came[0], here[1] - came[1]
+    dx2, dy2 = end[0] - here[0], end[1] - here[1]
+    return dx1 * dy2 - dy1 * dx2
+
+
+def shoelace(loop) -> float:
+    xs = np.array([p[0] for p in loop], dtype=np.float64)
+    ys = np.array([p[1] for p in loop], dtype=np.float64)
+    return 0.5 * float(np.dot(xs, np.roll(ys, -1)) - np.dot(ys, np.roll(xs, -1)))
+
+
+def drop_collinear(loop):
+    """Keep only the corners of a loop of grid points."""
+    kept = []
+    for i, here in enumerate(loop):
+        came, end = loop[i - 1], loop[(i + 1) % len(loop)]
+        if turn(came, here, end) != 0:
+            kept.append(here)
+    return kept
+
+
+def simplify(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Simplify a closed polygon with the Ramer-Douglas-Peucker algorithm."""
+    if len(points) < 4:
+        return points
+    offsets = points - points[0]
+    far = int(np.argmax(np.hypot(offsets[:, 0], offsets[:, 1])))
+    if far == 0:
+        return points[:1]
+    first = simplify_line(points[: far + 1], tolerance)
+    second = simplify_line(np.vstack([points[far:], points[:1]]), tolerance)
+    return np.vstack([first[:-1], second[:-1]])
+
+
+def simplify_line(points: np.ndarray, tolerance: float) -> np.ndarray:
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        between = points[first + 1 : last]
+        dx, dy = end - start
+        length = math.hypot(dx, dy)
+        offsets = between - start
+        if length == 0:
+            dists = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            dists = np.abs(dx * offsets[:, 1] - dy * offsets[:, 0]) / length
+        i = int(np.argmax(dists))
+        if dists[i] > tolerance:
+            keep[first + 1 + i] = True
+            stack += [(first, first + 1 + i), (first + 1 + i, last)]
+    return points[keep]
+
+
+def simplify_vertices(points: np.ndarray, max_vertices: int = MAX_VERTICES):
+    """Simplify a polygon until it has at most max_vertices vertices."""
+    tolerance = TOLERANCE
+    while len(points) > max_vertices:
+        points = simplify(points, tolerance)
+        tolerance *= 2
+    return points
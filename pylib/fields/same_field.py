@@ -3,6 +3,7 @@ from typing import Any
 
 from pylib.fields.base_field import BaseField
 from pylib.flag import Flag
+from pylib.note import Note
 
 
 @dataclass(kw_only=True)
@@ -29,6 +30,6 @@ class SameField(BaseField):
         else:
             value = ",".join(g.value for g in use)
             flag = Flag.ERROR
-            note = f"Not all values are the same: {value}"
+            note = Note("Not all values are the same: {0}", value)
 
         return cls.like(group, value=value, flag=flag, note=note)
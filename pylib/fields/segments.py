@@ -0,0 +1,44 @@
+"""Average field coordinates for many groups of fields at once.
+
+The coordinates for all of the groups are packed into one array and each group is
+a segment of consecutive rows. Segment sums give the means for every group in one
+pass.
+
+statistics.mean() is exact, but a float sum can be off by a few units in the
+last place. That only matters when a mean is rounded to a whole number and it is
+right at a halfway point, so those means are recalculated with statistics.mean().
+"""
+import statistics
+
+import numpy as np
+
+HALFWAY = 1e-6  # Recheck means closer than this to a halfway point
+
+
+def pack(groups, attrs: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Get a float array of the attributes for each field and the group offsets."""
+    values = [[getattr(f, a) for a in attrs] for group in groups for f in group]
+    values = np.array(values, dtype=np.float64).reshape(-1, len(attrs))
+    offsets = np.cumsum([0] + [len(g) for g in groups])[:-1]
+    return values, offsets
+
+
+def means(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Get the mean of each segment. Each segment needs at least one row."""
+    if not len(offsets):
+        return np.zeros((0, values.shape[1]))
+    counts = np.diff(np.append(offsets, len(values)))
+    return np.add.reduceat(values, offsets, axis=0) / counts[:, None]
+
+
+def rounded_means(values: np.ndarray, offsets: np.ndarray) -> list[list[int]]:
+    """Round segment means to whole numbers, like round(statistics.mean())."""
+    averages = means(values, offsets)
+
+    ends = np.append(offsets[1:], len(values))
+    frac = averages - np.floor(averages)
+    for i, j in zip(*np.nonzero(np.abs(frac - 0.5) < HALFWAY)):
+        column = values[offsets[i] : ends[i], j].tolist()
+        averages[i, j] = statistics.mean(column)
+
+    return np.rint(averages).astype(np.int64).tolist()
@@ -1,24 +1,40 @@
 """Reconcile free for text fields."""
 import re
+import sys
 from collections import defaultdict, namedtuple
 from dataclasses import dataclass
-from itertools import combinations
+from functools import cached_property
 from typing import Any
 
-from fuzzywuzzy import fuzz  # pylint: disable=import-error
-
+from pylib.fields import fuzzy_blocks
+from pylib.fields import fuzzy_scores
 from pylib.fields.base_field import BaseField
 from pylib.flag import Flag
-from pylib.utils import P
+from pylib.note import Note
 
 FuzzyRatioScore = namedtuple("FuzzyRatioScore", "score field")
 FuzzySetScore = namedtuple("FuzzySetScore", "score tokens field")
 
+PUNCT = re.compile(r"\W+")
+
 
 @dataclass(kw_only=True)
 class TextField(BaseField):
     value: str = ""
 
+    def __post_init__(self):
+        self.value = self.value if self.value else ""
+
+    @cached_property
+    def exact_key(self) -> str:
+        """The value with normalized spaces. Reused by every reconcile."""
+        return sys.intern(" ".join(self.value.split()))
+
+    @cached_property
+    def normalized_key(self) -> str:
+        """The lower case value without spaces or punctuation."""
+        return sys.intern(PUNCT.sub("", self.exact_key).lower())
+
     def to_dict(self, reconciled=False, add_note=False) -> dict[str, Any]:
         field_dict = {self.header(): self.value}
         return field_dict
@@ -31,38 +47,38 @@ class TextField(BaseField):
         match exact:
             # No matches
             case []:
-                note = (
-                    f"The {row_count} "
-                    f"{P('record', row_count)} {P('is', row_count)} blank"
-                )
+                note = Note("The {0} {0:record} {0:is} blank", row_count)
                 return cls.like(group, note=note, flag=Flag.ALL_BLANK)
 
             # Only one selected
             case [c0] if len(c0) == 1:
-                note = f"Only 1 transcript in {row_count} {P('record', row_count)}"
+                note = Note("Only 1 transcript in {0} {0:record}", row_count)
                 return cls.like(c0, note=note, value=c0[0].value, flag=Flag.ONLY_ONE)
 
             # Everyone chose the same value
             case [c0] if len(c0) > 1 and len(c0) == row_count:
-                note = (
-                    f"Exact unanimous match, {len(c0)} of {row_count} "
-                    f"{P('record', row_count)}"
+                note = Note(
+                    "Exact unanimous match, {0} of {1} {1:record}", len(c0), row_count
                 )
                 return cls.like(c0, note=note, value=c0[0].value, flag=Flag.UNANIMOUS)
 
             # It was a tie for the text chosen
             case [c0, c1, *_] if len(c0) > 1 and len(c0) == len(c1):
-                note = (
-                    f"Exact match is a tie, {len(c0)} of {row_count} "
-                    f"{P('record', row_count)} with {blanks} {P('blank', blanks)}"
+                note = Note(
+                    "Exact match is a tie, {0} of {1} {1:record} with {2} {2:blank}",
+                    len(c0),
+                    row_count,
+                    blanks,
                 )
                 return cls.like(c0, note=note, value=c0[0].value, flag=Flag.MAJORITY)
 
             # We have a winner
             case [c0, *_] if len(c0) > 1:
-                note = (
-                    f"Exact match, {len(c0)} of {row_count} "
-                    f"{P('record', row_count)} with {blanks} {P('blank', blanks)}"
+                note = Note(
+                    "Exact match, {0} of {1} {1:record} with {2} {2:blank}",
+                    len(c0),
+                    row_count,
+                    blanks,
                 )
                 return cls.like(c0, note=note, value=c0[0].value, flag=Flag.MAJORITY)
 
@@ -72,65 +88,69 @@ class TextField(BaseField):
         match norm:
             # No matches
             case []:
-                note = (
-                    f"The {row_count} normalized "
-                    f"{P('record', row_count)} {P('is', row_count)} blank"
-                )
+                note = Note("The {0} normalized {0:record} {0:is} blank", row_count)
                 return cls.like(group, note=note, flag=Flag.NO_MATCH)
 
             # Everyone chose the same value
             case [c0] if len(c0) > 1 and len(c0) == row_count:
-                note = (
-                    f"Normalized unanimous match, {len(c0)} of {row_count} "
-                    f"{P('record', row_count)}"
+                note = Note(
+                    "Normalized unanimous match, {0} of {1} {1:record}",
+                    len(c0),
+                    row_count,
                 )
                 return cls.like(c0, note=note, value=c0[0].value, flag=Flag.UNANIMOUS)
 
             # The winners are a tie
             case [c0, c1, *_] if len(c0) > 1 and len(c0) == len(c1):
-                note = (
-                    f"Normalized match is a tie, {len(c0)} of {row_count} "
-                    f"{P('record', row_count)} with {blanks} {P('blank', blanks)}"
+                note = Note(
+                    "Normalized match is a tie, {0} of {1} {1:record} "
+                    "with {2} {2:blank}",
+                    len(c0),
+                    row_count,
+                    blanks,
                 )
                 return cls.like(c0, note=note, value=c0[0].value, flag=Flag.MAJORITY)
 
             # We have a winner
             case [c0, *_] if len(c0) > 1:
-                note = (
-                    f"Normalized match, {len(c0)} of {row_count} "
-                    f"{P('record', row_count)} "
-                    f"with {blanks} {P('blank', blanks)}"
+                note = Note(
+                    "Normalized match, {0} of {1} {1:record} with {2} {2:blank}",
+                    len(c0),
+                    row_count,
+                    blanks,
                 )
                 return cls.like(c0, note=note, value=c0[0].value, flag=Flag.MAJORITY)
 
         # Check for simple in-place fuzzy matches
-        top = top_partial_ratio(group)
+        top = top_partial_ratio(group, args)
         if top and top.score >= args.fuzzy_ratio_threshold:
-            note = (
-                f"Partial ratio match on {row_count} "
-                f"{P('record', row_count)} with {blanks} "
-                f"{P('blank', blanks)}, score={top.score}"
+            note = Note(
+                "Partial ratio match on {0} {0:record} with {1} {1:blank}, score={2}",
+                row_count,
+                blanks,
+                top.score,
             )
             return cls.like(
                 top.field, note=note, value=top.field.value, flag=Flag.FUZZY
             )
 
         # Now look for the best token match
-        top = top_token_set_ratio(group)
-        if top.score >= args.fuzzy_set_threshold:
-            note = (
-                f"Token set ratio match on {row_count} "
-                f"{P('record', row_count)} with {blanks} "
-                f"{P('blank', blanks)}, score={top.score}"
+        top = top_token_set_ratio(group, args)
+        if top and top.score >= args.fuzzy_set_threshold:
+            note = Note(
+                "Token set ratio match on {0} {0:record} with {1} {1:blank}, "
+                "score={2}",
+                row_count,
+                blanks,
+                top.score,
             )
             return cls.like(
                 top.field, note=note, value=top.field.value, flag=Flag.FUZZY
             )
 
         # Nothing matches
-        note = (
-            f"No text match on {row_count} {P('record', row_count)} with {blanks} "
-            f"{P('blank', blanks)}"
+        note = Note(
+            "No text match on {0} {0:record} with {1} {1:blank}", row_count, blanks
         )
         return cls.like(exact[0], note=note, flag=Flag.NO_MATCH, value="")
 
@@ -139,8 +159,7 @@ def exact_matches(group, row_count) -> tuple[int, int, list[list]]:
     # Sort the fields by values
     filled = defaultdict(list)
     for field in group:
-        field.value = field.value if field.value else ""
-        if key := " ".join(field.value.split()):
+        if key := field.exact_key:
             filled[key].append(field)
 
     counters = sorted(filled.values(), key=lambda f: -len(f))
@@ -166,8 +185,7 @@ def normalized_exact_matches(group, row_count) -> tuple[int, int, list[list]]:
     # Sort the fields by normalized values
     filled = defaultdict(list)
     for field in group:
-        field.value = field.value if field.value else ""
-        if key := re.sub(r"\W+", "", field.value).lower():
+        if key := field.normalized_key:
             filled[key].append(field)
 
     # Bring the field with the longest value to the front of the list
@@ -181,37 +199,83 @@ def normalized_exact_matches(group, row_count) -> tuple[int, int, list[list]]:
     return count, blanks, counters
 
 
-def top_partial_ratio(group):
-    """Return the best partial ratio match from fuzzywuzzy module."""
-    scores = []
-    for c0, c1 in combinations(group, 2):
-        score = fuzz.partial_ratio(c0.value, c1.value)
-        field = c0 if len(c0.value) >= len(c1.value) else c1
-        scores.append(FuzzyRatioScore(score, field))
+def top_partial_ratio(group, args=None):
+    """Return the best partial ratio match from fuzzywuzzy module.
+
+    Only matches that reach the --fuzzy-ratio-threshold are returned. When
+    sweeping thresholds the best match for the lowest threshold is kept and
+    reused for the others.
+    """
+    values = [f.value for f in group]
+    threshold = getattr(args, "fuzzy_ratio_threshold", 0)
+    tops = getattr(args, "sweep_tops", None)  # Shared by the runs of a sweep
+
+    if tops is not None:
+        key = tuple(values)
+        if key not in tops:
+            tops[key] = best_partial_ratio(values, min(args.sweep_fuzzy_ratio), args)
+        best = tops[key]
+    else:
+        best = best_partial_ratio(values, threshold, args)
+
+    # The best match is the same for every threshold that it reaches
+    if best is None or best[0] < threshold:
+        return None
+
+    score, k = best
+    return FuzzyRatioScore(score, group[k])
 
-    scores = sorted(scores, reverse=True, key=lambda s: (s.score, len(s.field.value)))
-    return scores[0] if scores else None
 
+def best_partial_ratio(values, threshold, args=None) -> tuple[int, int] | None:
+    """Get the top partial ratio score at or above the threshold & its value index.
 
-def top_token_set_ratio(group):
+    We skip scoring pairs whose upper bound cannot beat the threshold or the best
+    so far.
+    """
+    pairs = fuzzy_blocks.candidate_pairs(values, args)
+    bounds, get_score = fuzzy_scores.bounded_scores(
+        values, fuzzy_scores.PARTIAL_RATIO, args, pairs
+    )
+
+    # Each pair picks its longer value, then the top score and length wins.
+    # The first pair wins ties
+    candidates = []
+    for order, (i, j) in enumerate(pairs):
+        if bounds[i, j] >= threshold:
+            k = i if len(values[i]) >= len(values[j]) else j
+            candidates.append(((bounds[i, j], len(values[k]), -order), i, j, k))
+
+    # Check the most promising pairs first
+    candidates.sort(reverse=True)
+
+    top, top_rank = None, None
+    for (bound, length, order), i, j, k in candidates:
+        if top_rank is not None and (bound, length, order) < top_rank:
+            break
+        rank = (get_score(i, j), length, order)
+        if rank[0] >= threshold and (top_rank is None or rank > top_rank):
+            top, top_rank = (rank[0], k), rank
+
+    return top
+
+
+def top_token_set_ratio(group, args=None):
     """Return the best token set ratio match from fuzzywuzzy module."""
-    scores = []
-    for c0, c1 in combinations(group, 2):
-        score = fuzz.token_set_ratio(c0.value, c1.value)
-        tokens_0 = len(c0.value.split())
-        tokens_1 = len(c1.value.split())
-        if tokens_0 > tokens_1:
-            field = c0
-            tokens = tokens_0
-        elif tokens_0 < tokens_1:
-            field = c1
-            tokens = tokens_1
+    values = [f.value for f in group]
+    tokens = [len(v.split()) for v in values]
+    pairs = fuzzy_blocks.candidate_pairs(values, args)
+    scores = fuzzy_scores.score_pairs(
+        values, fuzzy_scores.TOKEN_SET_RATIO, args, pairs
+    )
+
+    top, top_rank = None, None
+    for i, j in pairs:
+        if tokens[i] != tokens[j]:
+            k = i if tokens[i] > tokens[j] else j
         else:
-            field = c0 if len(c0.value) <= len(c1.value) else c1
-            tokens = tokens_0
-        scores.append(FuzzySetScore(score, tokens, field))
+            k = i if len(values[i]) <= len(values[j]) else j
+        rank = (scores[i, j], tokens[k], -len(values[k]))
+        if top is None or rank > top_rank:
+            top, top_rank = FuzzySetScore(scores[i, j], tokens[k], group[k]), rank
 
-    ordered = sorted(
-        scores, reverse=True, key=lambda s: (s.score, s.tokens, -len(s.field.value))
-    )
-    return ordered[0]
+    return top
@@ -41,7 +41,7 @@ def validate_columns(args, df):
             errors.append(e)
 
     if errors:
-        utils.error_exit(errors)
+        raise utils.ReconcileError("\n".join(str(e) for e in errors))
 
     return column_types
 
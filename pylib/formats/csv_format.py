@@ -5,4 +5,8 @@ from . import common_format
 
 def read(args):
     df = pd.read_csv(args.input_file, dtype=str)
+    return read_df(args, df)
+
+
+def read_df(args, df):
     return common_format.read_table(args, df)
@@ -1,12 +1,17 @@
+import functools
 import json
+import os
 import re
 from collections import namedtuple
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from dateutil.parser import parse as date_parse
 from jsonpath_ng import parse
 
 from pylib import utils
+from pylib.fields import polygons
 from pylib.row import BoxField
 from pylib.row import HighlightField
 from pylib.row import LengthField
@@ -29,11 +34,15 @@ WF_String = namedtuple("WF_String", "value title")
 def read(args):
     """Read and convert the input CSV data."""
     df = pd.read_csv(args.input_file, dtype=str)
+    return read_df(args, df)
 
+
+def read_df(args, df):
+    """Convert a data frame of the input CSV data."""
     args.workflow_id = get_workflow_id(args, df)
     args.workflow_name = get_workflow_name(args, df)
 
-    df = df.loc[df.workflow_id == str(args.workflow_id), :].fillna("")
+    df = df.loc[df.workflow_id.astype(str) == str(args.workflow_id), :].fillna("")
     raw_records = df.to_dict("records")
 
     # A hack to workaround UUID coded values returned from Zooniverse
@@ -216,7 +225,11 @@ def point_task(task: dict, row: Row, strings, task_id: str) -> None:
 
 
 def polygon_task(task: dict, row: Row, task_id: str) -> None:
-    points = [utils.Point(x=p["x"], y=p["y"]) for p in task["value"][0]["points"]]
+    points = [(p["x"], p["y"]) for p in task["value"][0]["points"]]
+    if len(points) > polygons.MAX_VERTICES:
+        points = polygons.simplify_vertices(np.array(points, dtype=np.float64))
+        points = points.tolist()
+    points = [utils.Point(x=x, y=y) for x, y in points]
     field = PolygonField(name=task["task_label"], task_id=task_id, points=points)
     row.add(field)
 
@@ -283,12 +296,12 @@ def get_workflow_id(args, df):
         return args.workflow_id
 
     if "workflow_id" not in df.columns:
-        utils.error_exit("This is not a Notes from Nature CSV.")
+        raise utils.ReconcileError("This is not a Notes from Nature CSV.")
 
     workflow_ids = df.workflow_id.unique()
 
     if len(workflow_ids) > 1:
-        utils.error_exit(
+        raise utils.ReconcileError(
             "There are multiple workflows in this file. "
             "You must provide a workflow ID as an argument."
         )
@@ -306,15 +319,26 @@ def get_workflow_name(args, df):
         workflow_name = df.workflow_name.iloc[0]
         workflow_name = re.sub(r"^[^_]*_", "", workflow_name)
     except KeyError:
-        utils.error_exit("Workflow name not found in classifications file.")
+        raise utils.ReconcileError("Workflow name not found in classifications file.")
     return workflow_name
 
 
 def get_workflow_strings(workflow_csv, workflow_id) -> dict[str, WF_String]:
-    """Get strings from the workflow for when they're not in the annotations."""
+    """Get strings from the workflow for when they're not in the annotations.
+
+    They are kept until the workflow file changes, so a long-running service does
+    not parse the same workflow file for every job.
+    """
     if not workflow_csv:
         return {}
 
+    stat = os.stat(workflow_csv)
+    path = str(Path(workflow_csv).resolve())
+    return load_workflow_strings(path, stat.st_mtime_ns, stat.st_size, workflow_id)
+
+
+@functools.lru_cache(maxsize=32)
+def load_workflow_strings(workflow_csv, _mtime, _size, workflow_id):
     df = pd.read_csv(workflow_csv)
     df = df.loc[df.workflow_id == int(workflow_id), :]
     workflow = df.iloc[-1]  # Get the most recent version
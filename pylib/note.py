@@ -0,0 +1,96 @@
+"""Explanation notes that are only rendered when they are written.
+
+Every reconciled field gets a note but they are only output with --explanations
+or --summary. So a note keeps its template and counts and the text is built when
+it is needed. The text for each distinct (template, counts) pair is built once.
+
+Templates are str.format() strings. A format spec that is a word is pluralized
+by the count it is attached to: "{0} {0:record}" is "1 record" or "2 records".
+"""
+import functools
+import string
+
+from pylib.utils import P
+
+
+class Formatter(string.Formatter):
+    def format_field(self, value, format_spec):
+        if format_spec.isalpha():
+            return P(format_spec, value)
+        return super().format_field(value, format_spec)
+
+
+FORMATTER = Formatter()
+
+
+@functools.lru_cache(maxsize=2**16)
+def render(template: str, counts: tuple) -> str:
+    return FORMATTER.format(template, *counts)
+
+
+@functools.lru_cache(maxsize=2**10)
+def parts(template: str) -> tuple[bool, tuple | None]:
+    """Does the template have text outside of its fields & which counts does it use.
+
+    The counts are None when a field is not a plain index like "{0}".
+    """
+    text = False
+    fields = []
+    for literal, field, *_ in FORMATTER.parse(template):
+        text = text or bool(literal)
+        if field is not None:
+            fields.append(int(field) if field.isdigit() else None)
+    return text, None if None in fields else tuple(fields)
+
+
+def is_blank(value) -> bool:
+    """Is a count written as an empty string."""
+    return isinstance(value, (str, Note)) and not value
+
+
+class Note:
+    """A note template and its counts. It compares equal to its text.
+
+    Notes hash by their template & counts, not the text, so keep them apart from
+    strings in a set or as dict keys.
+    """
+
+    __slots__ = ("template", "counts")
+
+    def __init__(self, template: str, *counts):
+        self.template = template
+        self.counts = counts
+
+    def __str__(self) -> str:
+        return render(self.template, self.counts)
+
+    def __repr__(self) -> str:
+        counts = "".join(f", {c!r}" for c in self.counts)
+        return f"Note({self.template!r}{counts})"
+
+    def __format__(self, format_spec) -> str:
+        return format(str(self), format_spec)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Note):
+            return (self.template, self.counts) == (other.template, other.counts)
+        if isinstance(other, str):
+            return str(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.template, self.counts))
+
+    def __bool__(self) -> bool:
+        text, fields = parts(self.template)
+        if text:
+            return True
+        if fields is None:
+            return bool(str(self))
+        return not all(is_blank(self.counts[i]) for i in fields)
+
+    def __getstate__(self):
+        return self.template, self.counts
+
+    def __setstate__(self, state):
+        self.template, self.counts = state
@@ -0,0 +1,134 @@
+"""Reconciliation options, their defaults, and argument types.
+
+This module only uses the standard library so that the command line can be
+parsed without importing the heavy modules that reconciling needs.
+"""
+import argparse
+from dataclasses import dataclass, fields
+from importlib import util as i_util
+
+from pylib.utils import ReconcileError
+
+VERSION = "0.8.4"
+
+FORMATS = ["nfn", "csv", "json"]
+FUZZY_BACKENDS = ["fuzzywuzzy", "rapidfuzz"]
+FUZZY_BLOCK_SIZE = 0  # Only use blocking for groups larger than this, 0 is off
+FUZZY_CACHE_SIZE = 100_000
+POLYGON_GRID = 128  # Default number of grid cells on the longest side
+
+
+@dataclass(kw_only=True)
+class Options:
+    """How to read and reconcile classifications.
+
+    These have the same names and defaults as the reconcile.py arguments. The
+    pipeline reads options as attributes so it also takes the parsed arguments.
+    """
+
+    input_file: str = ""
+    format: str = "nfn"
+    workflow_id: int | None = None
+    workflow_name: str | None = None
+    workflow_csv: str = ""
+    column_types: list[str] | None = None
+    group_by: str = "subject_id"
+    row_key: str = "classification_id"
+    user_column: str = "user_name"
+    max_transcriptions: int = 50
+    fuzzy_ratio_threshold: int = 90
+    fuzzy_set_threshold: int = 50
+    fuzzy_backend: str = "fuzzywuzzy"
+    fuzzy_workers: int = 1
+    fuzzy_block_size: int = FUZZY_BLOCK_SIZE
+    cluster_marks: float | None = None
+    polygon_grid: int = POLYGON_GRID
+    join_distance: int = 6
+    max_per_subject: int | None = None
+    result_cache: str | None = None
+    checkpoint: str | None = None
+    checkpoint_every: int = 100
+    resume: bool = False
+    page_size: int = 20
+    no_summary_detail: bool = False
+    reconciler_version: str = VERSION
+
+    @classmethod
+    def from_args(cls, args) -> "Options":
+        """Get the options from parsed arguments, or any object with attributes."""
+        names = [f.name for f in fields(cls) if hasattr(args, f.name)]
+        return cls(**{n: getattr(args, n) for n in names})
+
+    def validate(self) -> None:
+        if errors := check(self):
+            raise ReconcileError("\n".join(errors))
+
+
+def check(args) -> list[str]:
+    """Get the errors in the option values."""
+    errors = []
+
+    if args.format not in FORMATS:
+        errors.append(f"--format must be one of: {', '.join(FORMATS)}.")
+
+    if args.fuzzy_ratio_threshold < 0 or args.fuzzy_ratio_threshold > 100:
+        errors.append("--fuzzy-ratio-threshold must be between 0 and 100.")
+
+    if args.fuzzy_set_threshold < 0 or args.fuzzy_set_threshold > 100:
+        errors.append("--fuzzy-set-threshold must be between 0 and 100.")
+
+    if args.fuzzy_backend not in FUZZY_BACKENDS:
+        errors.append(f"--fuzzy-backend must be one of: {', '.join(FUZZY_BACKENDS)}.")
+
+    if args.fuzzy_backend == "rapidfuzz" and not has_module("rapidfuzz"):
+        errors.append("The rapidfuzz backend requires the rapidfuzz module.")
+
+    if args.fuzzy_workers < 1:
+        errors.append("--fuzzy-workers must be at least 1.")
+
+    if args.cluster_marks is not None and args.cluster_marks <= 0:
+        errors.append("--cluster-marks must be greater than 0.")
+
+    if args.polygon_grid < 4:
+        errors.append("--polygon-grid must be at least 4.")
+
+    if args.fuzzy_block_size < 0:
+        errors.append("--fuzzy-block-size must not be negative.")
+
+    if args.max_per_subject is not None and args.max_per_subject < 1:
+        errors.append("--max-per-subject must be at least 1.")
+
+    if args.resume and not args.checkpoint:
+        errors.append("--resume requires a --checkpoint file.")
+
+    if args.checkpoint_every < 1:
+        errors.append("--checkpoint-every must be at least 1.")
+
+    return errors
+
+
+def has_module(name: str) -> bool:
+    """Check if an optional module is installed without importing it."""
+    return i_util.find_spec(name) is not None
+
+
+def shard_arg(value: str) -> tuple[int, int]:
+    """Parse an "i/N" shard argument."""
+    try:
+        index, count = (int(v) for v in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not formatted like 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"Shard '{value}' is out of range")
+    return index, count
+
+
+def thresholds_arg(value: str) -> list[int]:
+    """Parse a comma separated list of thresholds like "70,80,90"."""
+    try:
+        thresholds = sorted({int(v) for v in value.split(",")})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not formatted like 70,80,90")
+    if not all(0 <= t <= 100 for t in thresholds):
+        raise argparse.ArgumentTypeError("Thresholds must be from 0 to 100")
+    return thresholds
@@ -0,0 +1,151 @@
+"""Reconcile the subjects in chunks on a pool of threads.
+
+The stages run in threads connected by bounded queues:
+
+    reader       parses the input file and sends chunks of subjects to reconcile
+    reconcilers  reconcile each chunk with Table.reconcile
+    writers      one writes the unreconciled file while the subjects are
+                 reconciled, the other collects the reconciled subjects in order
+                 and writes the reconciled file
+
+This is a simple thread pool, reading does not overlap with reconciling. A
+subject's reconciled row has a field for every column in the input file, so the
+reader parses the whole file before it sends the first chunk. Only the writing of
+the unreconciled file overlaps with reconciling. The reconcilers share the GIL,
+so more of them only help where the work releases it, like file output and the
+rapidfuzz backend's worker threads. The reconcilers get the same subjects in the
+same order as a plain run so the output is the same.
+
+Reconciling may renumber the unreconciled fields, highlights do this, so the
+unreconciled file is written from a copy of the fields taken before reconciling.
+"""
+import copy
+import queue
+import threading
+from concurrent.futures import FIRST_EXCEPTION
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from itertools import groupby
+from itertools import islice
+
+from pylib.row import Row
+from pylib.table import Table
+
+CHUNK = 100  # Subjects per chunk
+DONE = None  # The end of a queue
+
+
+class Pipeline:
+    def __init__(self, args, read_table):
+        self.args = args
+        self.read_table = read_table
+        self.workers = args.pipeline_workers
+        self.chunks = queue.Queue(maxsize=2 * self.workers)
+        self.results = queue.Queue(maxsize=2 * self.workers)
+        self.tables = queue.Queue(maxsize=1)
+        self.stop = threading.Event()  # Another stage failed
+
+    def run(self) -> tuple[Table, Table]:
+        with ThreadPoolExecutor(max_workers=self.workers + 3) as executor:
+            reader = executor.submit(self.reader)
+            reconcilers = [
+                executor.submit(self.reconciler) for _ in range(self.workers)
+            ]
+            unreconciled = executor.submit(self.unreconciled_writer)
+            reconciled = executor.submit(self.reconciled_writer)
+
+            futures = [reader, *reconcilers, unreconciled, reconciled]
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            if any(f.exception() for f in done):
+                self.stop.set()
+
+        # Raise the error that stopped the pipeline, not the stages it interrupted
+        errors = [f.exception() for f in futures if f.exception()]
+        if errors:
+            raise next(
+                (e for e in errors if not isinstance(e, InterruptedError)), errors[0]
+            )
+
+        return unreconciled.result(), reconciled.result()
+
+    def put(self, queue_, item) -> None:
+        while not self.stop.is_set():
+            try:
+                queue_.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise InterruptedError("Another stage failed")
+
+    def get(self, queue_):
+        while not self.stop.is_set():
+            try:
+                return queue_.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        raise InterruptedError("Another stage failed")
+
+    def reader(self) -> None:
+        table = self.read_table(self.args)
+        snapshot = self.snapshot(table) if self.args.unreconciled else None
+        self.put(self.tables, (table, snapshot))
+
+        key = self.args.group_by
+        rows = sorted(table.rows, key=lambda r: r[key].value)
+        groups = (list(g) for _, g in groupby(rows, key=lambda r: r[key].value))
+
+        for i, chunk in enumerate(iter(lambda: list(islice(groups, CHUNK)), [])):
+            chunk_rows = [r for g in chunk for r in g]
+            self.put(self.chunks, (i, Table(rows=chunk_rows, types=table.types)))
+
+        for _ in range(self.workers):
+            self.put(self.chunks, DONE)
+
+    def reconciler(self) -> None:
+        while (item := self.get(self.chunks)) is not DONE:
+            i, chunk = item
+            self.put(self.results, (i, chunk.reconcile(self.args).rows))
+        self.put(self.results, DONE)
+
+    @staticmethod
+    def snapshot(table: Table) -> Table:
+        """Copy the fields so that reconciling cannot change them while writing."""
+        snapshot = Table(types=table.types)
+        for row in table.rows:
+            fields = {k: copy.copy(f) for k, f in row.fields.items()}
+            snapshot.rows.append(Row(fields=fields))
+        return snapshot
+
+    def unreconciled_writer(self) -> Table:
+        table, snapshot = self.get(self.tables)
+        if snapshot is not None:
+            snapshot.to_csv(self.args, self.args.unreconciled)
+        return table
+
+    def reconciled_writer(self) -> Table:
+        """Add the reconciled subjects in input order, the chunks finish in any."""
+        table = Table(reconciled=True)
+        pending = {}
+        next_chunk = 0
+        finished = 0
+
+        while finished < self.workers:
+            item = self.get(self.results)
+            if item is DONE:
+                finished += 1
+                continue
+            i, rows = item
+            pending[i] = rows
+            while next_chunk in pending:
+                for row in pending.pop(next_chunk):
+                    table.add(row)
+                next_chunk += 1
+
+        if self.args.reconciled:
+            table.to_csv(self.args, self.args.reconciled, self.args.explanations)
+        return table
+
+
+def run(args, read_table) -> tuple[Table, Table]:
+    """Reconcile the tables on a thread pool and write them. Returns both tables."""
+    return Pipeline(args, read_table).run()
@@ -0,0 +1,84 @@
+"""Reuse reconciled subjects from earlier runs.
+
+Most subjects in a weekly export are unchanged since the last export. We key each
+subject by a hash of its classifications plus the options that change how it is
+reconciled and the table's columns. A reconciled row has a field for every column
+in the table, even the ones the subject leaves blank, so the same subject in an
+export with other columns is a different row. A subject with a known key reuses
+the reconciled row from the cache.
+"""
+import hashlib
+import json
+import shelve
+
+from pylib.row import Row
+
+# These are the options that change a reconciled row
+KEY_OPTIONS = """
+    reconciler_version fuzzy_ratio_threshold fuzzy_set_threshold join_distance
+    group_by max_per_subject fuzzy_backend fuzzy_block_size cluster_marks
+    polygon_grid
+    """.split()
+
+
+class ResultCache:
+    def __init__(self, args, types=None):
+        options = {k: getattr(args, k, None) for k in KEY_OPTIONS}
+        options["columns"] = [[n, type(f).__name__] for n, f in (types or {}).items()]
+        self.options = json.dumps(options, sort_keys=True)
+        self.store = self.open(args)
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def open(self, args):
+        path = getattr(args, "result_cache", None)
+        return shelve.open(path) if path else None
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def key(self, row_group: list[Row]) -> str:
+        """Hash the classifications for a subject and the table's columns.
+
+        The classification ID is one of the fields, so this includes them.
+        """
+        digest = hashlib.sha256(self.options.encode())
+        for row in row_group:
+            digest.update(repr(list(row.fields.values())).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str, row_group: list[Row]) -> Row | None:
+        if self.store is None:
+            return None
+
+        hit = self.store.get(key)
+        if hit is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        new_row, suffixes = hit
+
+        # Reconciling may renumber unreconciled fields, so we repeat that here
+        for row, row_suffixes in zip(row_group, suffixes):
+            for field, suffix in zip(row.fields.values(), row_suffixes):
+                field.suffix = suffix
+
+        return new_row
+
+    def put(self, key: str, row_group: list[Row], new_row: Row) -> None:
+        if self.store is None:
+            return
+        self.store[key] = (new_row, self.suffixes(row_group))
+
+    @staticmethod
+    def suffixes(row_group: list[Row]) -> list[list]:
+        return [[f.suffix for f in row.fields.values()] for row in row_group]
@@ -0,0 +1,212 @@
+"""Run reconciliation jobs in a long-running local service.
+
+Every reconcile.py run pays to start Python, import the modules, and warm up its
+caches. The service does that once. It takes jobs over HTTP on the local machine
+and runs them on a pool of worker threads, so the modules, the workflow strings,
+and the fuzzy match scores stay warm from job to job.
+
+A job is the parsed reconcile.py arguments as JSON. The client parses and checks
+the arguments first so that bad arguments fail the same way they do for
+reconcile.py. The service writes the output files itself and sends back their
+paths and anything that the job printed.
+
+Jobs can read and write any file that the service can, so only the user who
+started the service may send them. The service writes a random token to a file
+that only that user can read and every job must send it back.
+
+The jobs share one fuzzy match score cache. Its size is set when the service
+starts, so a job's --fuzzy-cache-size is ignored.
+"""
+import hmac
+import importlib
+import io
+import json
+import os
+import secrets
+import traceback
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from urllib import request as url_request
+from urllib.error import HTTPError
+from urllib.error import URLError
+
+from pylib import utils
+
+HOST = "127.0.0.1"
+PORT = 8765
+ADDRESS = f"http://{HOST}:{PORT}"
+ADDRESS_VAR = "RECONCILE_SERVICE"  # Environment variable to change the address
+TOKEN_FILE = Path.home() / ".reconcile_service_token"
+TOKEN_VAR = "RECONCILE_SERVICE_TOKEN"  # Environment variable to change the file
+TOKEN_HEADER = "X-Reconcile-Token"
+
+# The service has its own working directory so these are sent as absolute paths
+PATH_ARGS = """
+    input_file unreconciled reconciled summary zip workflow_csv result_cache
+    checkpoint shard_file
+    """.split()
+OUTPUT_ARGS = """unreconciled reconciled summary shard_file""".split()
+
+
+# #####################################################################################
+def make_server(runner, token, host=HOST, port=PORT, workers=1, version=""):
+    """Build a server that runs jobs with runner(args, stdout, stderr).
+
+    Only jobs that send the token are run.
+    """
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.runner = runner
+    server.token = token
+    server.pool = ThreadPoolExecutor(max_workers=workers)
+    server.version = version
+    return server
+
+
+def serve(
+    runner,
+    host=HOST,
+    port=PORT,
+    workers=1,
+    version="",
+    cache_size=None,
+    token_file=None,
+):
+    warm_up(cache_size)
+    token_file = token_path(token_file)
+    token = write_token(token_file)
+    server = make_server(runner, token, host, port, workers, version)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        server.pool.shutdown()
+        if read_token(token_file) == token:  # Another service may have replaced it
+            token_file.unlink()
+
+
+def token_path(token_file=None) -> Path:
+    return Path(token_file if token_file else os.environ.get(TOKEN_VAR, TOKEN_FILE))
+
+
+def write_token(path: Path) -> str:
+    """Write a new token to a file that only this user can read."""
+    token = secrets.token_hex(32)
+    path.unlink(missing_ok=True)  # So we do not keep the mode of an old file
+    handle = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(handle, "w") as out_file:
+        out_file.write(token)
+    return token
+
+
+def read_token(path: Path) -> str | None:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def warm_up(cache_size=None):
+    """Import the modules and build the objects that the jobs need."""
+    for module in ("pylib.api", "pylib.summary", "pylib.sweep", "pylib.table_cache"):
+        importlib.import_module(module)
+    if cache_size is not None:
+        fuzzy_scores = importlib.import_module("pylib.fields.fuzzy_scores")
+        fuzzy_scores.set_cache_size(cache_size)
+    _ = list(utils.get_plugins("formats").values())
+    utils.engine()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/status":
+            self.send_error(404)
+            return
+        self.send_json({"version": self.server.version})
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            self.send_error(404)
+            return
+        token = self.headers.get(TOKEN_HEADER, "")
+        if not hmac.compare_digest(token.encode(), self.server.token.encode()):
+            self.send_error(403, "The job does not have the service's token")
+            return
+        try:
+            size = int(self.headers.get("Content-Length", 0))
+            job = json.loads(self.rfile.read(size))
+        except ValueError as err:  # Includes JSON and Unicode errors
+            self.send_error(400, f"The job is not valid JSON: {err}")
+            return
+        if not isinstance(job, dict):
+            self.send_error(400, "The job is not a JSON object")
+            return
+        future = self.server.pool.submit(run_job, self.server.runner, job)
+        self.send_json(future.result())
+
+    def send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def run_job(runner, job: dict) -> dict:
+    """Run a job and get its exit status, what it printed, and its output files."""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    status = 0
+    try:
+        runner(Namespace(**job), stdout, stderr)
+    except utils.ReconcileError as err:
+        status = 1
+        print(err, file=stderr)
+    except SystemExit as err:
+        status = err.code if isinstance(err.code, int) else 1
+    except Exception:  # pylint: disable=broad-except
+        status = 1
+        stderr.write(traceback.format_exc())
+    return {
+        "status": status,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "outputs": output_paths(job),
+    }
+
+
+def output_paths(job: dict) -> list[str]:
+    paths = [job["zip"]] if job.get("zip") else [job.get(k) for k in OUTPUT_ARGS]
+    return [p for p in paths if p and os.path.exists(p)]
+
+
+# #####################################################################################
+def job_args(args: Namespace) -> dict:
+    job = dict(vars(args))
+    for key in PATH_ARGS:
+        if job.get(key):
+            job[key] = os.path.abspath(job[key])
+    return job
+
+
+def submit(args: Namespace, address=None, token_file=None) -> dict | None:
+    """Send a job to the service. This is None if the service is not running."""
+    address = address if address else os.environ.get(ADDRESS_VAR, ADDRESS)
+    token = read_token(token_path(token_file))
+    if token is None:  # The service is not running for this user
+        return None
+    request = url_request.Request(
+        f"{address}/jobs",
+        data=json.dumps(job_args(args)).encode(),
+        headers={"Content-Type": "application/json", TOKEN_HEADER: token},
+    )
+    opener = url_request.build_opener(url_request.ProxyHandler({}))  # It is local
+    try:
+        with opener.open(request) as response:
+            return json.load(response)
+    except HTTPError:
+        raise
+    except URLError:
+        return None
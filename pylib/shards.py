@@ -0,0 +1,99 @@
+"""Split a reconciliation across machines and merge the results.
+
+Every shard reads the whole input file but only reconciles the subjects whose
+group-by hash falls into that shard. A shard writes its part of the unreconciled
+and reconciled tables to a shard file. Merging all the shard files rebuilds the
+full tables and writes the same outputs as a single run.
+"""
+import zlib
+
+import numpy as np
+
+from pylib import table_cache
+from pylib import utils
+from pylib.table import Table
+
+# These arguments are needed to write the outputs from the merged tables
+KEEP_ARGS = """
+    input_file workflow_id workflow_name group_by row_key user_column
+    max_transcriptions
+    """.split()
+
+
+def shard_of(value, count: int) -> int:
+    """Hash the group-by value into a shard. This is stable across machines."""
+    return zlib.crc32(str(value).encode("utf-8")) % count + 1
+
+
+def select(args, table: Table) -> tuple[Table, list[int]]:
+    """Get the rows for this shard and their positions in the input."""
+    index, count = args.shard
+    shard = Table(types=table.types)
+    positions = []
+    for i, row in enumerate(table.rows):
+        if shard_of(row[args.group_by].value, count) == index:
+            shard.rows.append(row)
+            positions.append(i)
+    return shard, positions
+
+
+def write(args, unreconciled: Table, reconciled: Table, positions) -> None:
+    header = {
+        "shard": list(args.shard),
+        "fingerprint": table_cache.get_fingerprint(args),
+        "args": {k: getattr(args, k, None) for k in KEEP_ARGS},
+    }
+    table_cache.dump(
+        args.shard_file,
+        header,
+        {"unreconciled": unreconciled, "reconciled": reconciled},
+        {"positions": np.array(positions, dtype=np.int64)},
+    )
+
+
+def merge(paths) -> tuple[dict, Table, Table]:
+    """Merge the shard files into full unreconciled and reconciled tables."""
+    shards = {}
+    for path in paths:
+        loaded = table_cache.load(path)
+        if not loaded or "shard" not in loaded[0]:
+            raise utils.ReconcileError(f"'{path}' is not a shard file.")
+        header = loaded[0]
+        shards[tuple(header["shard"])] = loaded
+
+    headers = [s[0] for s in shards.values()]
+    count = headers[0]["shard"][1]
+    expect = {(i, count) for i in range(1, count + 1)}
+
+    if set(shards) != expect or any(h["shard"][1] != count for h in headers):
+        raise utils.ReconcileError(
+            f"Need exactly one file for each of the {count} shards."
+        )
+
+    if len({h["fingerprint"] for h in headers}) != 1:
+        raise utils.ReconcileError(
+            "The shard files are from different inputs or options."
+        )
+
+    args = headers[0]["args"]
+
+    # Put the unreconciled rows back into their input order
+    positioned = []
+    for _, tables, extras in shards.values():
+        rows = tables["unreconciled"].rows
+        positioned += zip(extras["positions"].tolist(), rows)
+    positioned.sort(key=lambda p: p[0])
+
+    unreconciled = Table()
+    for _, row in positioned:
+        unreconciled.add(row)
+
+    # Sort the reconciled rows like Table.reconcile does
+    rows = [r for _, t, _ in shards.values() for r in t["reconciled"].rows]
+    rows = sorted(rows, key=lambda r: r[args["group_by"]].value)
+
+    reconciled = Table(reconciled=True)
+    for row in rows:
+        reconciled.add(row)
+
+    return args, unreconciled, reconciled
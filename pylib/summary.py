@@ -19,14 +19,17 @@ ALIAS = "__alias__"
 ROW_TYPE = "__row_type__"
 
 
-def report(args, unreconciled: Table, reconciled: Table):
+def report(args, unreconciled: Table, reconciled: Table, path=None):
+    """Write the summary to the path or to the --summary file."""
     pd.options.styler.render.max_elements = 999_999_999
     pd.options.styler.render.max_rows = 999_999
 
     unreconciled_df = unreconciled.to_df(args)
     reconciled_df = reconciled.to_df(args)
     flag_df = reconciled.to_flag_df(args)
-    alias_group_by(args, unreconciled_df, reconciled_df, flag_df)
+    unreconciled_df, reconciled_df = alias_group_by(
+        args, unreconciled_df, reconciled_df, flag_df
+    )
 
     has_users = 1 if args.user_column in unreconciled_df.columns else 0
     transcribers_df = get_transcribers_df(args, unreconciled_df)
@@ -62,7 +65,7 @@ def report(args, unreconciled: Table, reconciled: Table):
         print_detail=print_detail,
     )
 
-    with open(args.summary, "w", encoding="utf-8") as out_file:
+    with open(path if path else args.summary, "w", encoding="utf-8") as out_file:
         out_file.write(summary)
 
 
@@ -72,15 +75,23 @@ def alias_group_by(args, unreconciled_df, reconciled_df, flag_df):
     The group-by field is typically something sensible like a subject-id, but
     in CSV or JSON files it can be anything like a file name, so we should both
     shorten long IDs and make sure we can easily put them into HTML data fields.
+
+    The tables share their data frames with the other outputs, so this returns
+    new unreconciled & reconciled data frames instead of changing them.
     """
     aliases = reconciled_df[args.group_by].to_dict()
     aliases = {v: k for k, v in aliases.items()}
 
-    unreconciled_df[ALIAS] = unreconciled_df[args.group_by].map(aliases)
-    reconciled_df[ALIAS] = reconciled_df[args.group_by].map(aliases)
+    unreconciled_df = unreconciled_df.assign(
+        **{ALIAS: unreconciled_df[args.group_by].map(aliases)}
+    )
+    reconciled_df = reconciled_df.assign(
+        **{ALIAS: reconciled_df[args.group_by].map(aliases)}
+    )
     flag_df[ALIAS] = flag_df[args.group_by].map(aliases)
 
     flag_df.set_index(ALIAS, drop=False, inplace=True)
+    return unreconciled_df, reconciled_df
 
 
 def header_data(args, unreconciled, reconciled, transcribers):
@@ -0,0 +1,66 @@
+"""Reconcile with several fuzzy ratio thresholds at once.
+
+The expensive part of changing the fuzzy ratio threshold is scoring pairs of
+strings. A pair's score does not depend on the threshold, so the best partial
+ratio match for each group of text values is found once, for the lowest
+threshold, and reused by the runs for the higher thresholds.
+"""
+from argparse import Namespace
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+from pylib.flag import Flag
+from pylib.flag import flag_labels
+from pylib.table import Table
+
+
+def sweep(args, unreconciled: Table) -> dict[int, Table]:
+    """Reconcile the table once for each threshold."""
+    results = {}
+    tops = {}  # The best partial ratio matches for the lowest threshold
+    for threshold in args.sweep_fuzzy_ratio:
+        run_args = Namespace(**vars(args))
+        run_args.fuzzy_ratio_threshold = threshold
+        run_args.sweep_tops = tops
+        results[threshold] = unreconciled.reconcile(run_args)
+    return results
+
+
+def sweep_path(path, threshold: int) -> Path:
+    """Add the threshold to a file name: reconciled.csv -> reconciled.ratio-80.csv"""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.ratio-{threshold}{path.suffix}")
+
+
+def flag_counts(results: dict[int, Table]) -> pd.DataFrame:
+    """Count the flags for each field with each threshold."""
+    labels = flag_labels()
+    counts = {}
+    for threshold, reconciled in results.items():
+        counter = Counter(
+            (field.field_name, Flag(field.flag))
+            for row in reconciled.rows
+            for field in row.tasks
+        )
+        counts[threshold] = counter
+
+    keys = sorted({k for c in counts.values() for k in c})
+    index = pd.MultiIndex.from_tuples(
+        [(name, labels.get(flag, flag.name)) for name, flag in keys],
+        names=["Field", "Flag"],
+    )
+    data = {f"Ratio {t}": [c[k] for k in keys] for t, c in counts.items()}
+    return pd.DataFrame(data, index=index)
+
+
+def report(args, results: dict[int, Table], file=None) -> None:
+    """Write a reconciled CSV per threshold and print a comparison of the flags."""
+    if args.reconciled:
+        for threshold, reconciled in results.items():
+            path = sweep_path(args.reconciled, threshold)
+            reconciled.to_csv(args, path, args.explanations)
+
+    df = flag_counts(results)
+    print(df.to_string(), file=file)
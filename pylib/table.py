@@ -1,13 +1,20 @@
 import re
+from collections import defaultdict
 from dataclasses import dataclass, field as default
 from argparse import Namespace
 from itertools import groupby
 
 import pandas as pd
 
+from pylib import csv_writer
+from pylib.checkpoint import Checkpoint
 from pylib.fields.base_field import Flag
+from pylib.fields.controlled_vocab import batch_controlled_vocab
+from pylib.fields.mark_index_field import MarkIndexField
+from pylib.fields.select_field import SelectField
+from pylib.result_cache import ResultCache
 from pylib.row import Row, AnyField
-from pylib.utils import P
+from pylib.note import Note
 
 
 @dataclass
@@ -15,6 +22,10 @@ class Table:
     rows: list[Row] = default(default_factory=list)
     types: dict[str, AnyField] = default(default_factory=dict)
     reconciled: bool = False
+    # The data frames from to_df() keyed by the options that change them
+    frames: dict[tuple, pd.DataFrame] = default(
+        default_factory=dict, repr=False, compare=False
+    )
 
     def __len__(self) -> int:
         return len(self.rows)
@@ -23,89 +34,246 @@ class Table:
         self.rows.append(row)
         for field in row.fields.values():
             self.types[field.field_name] = field
+        self.frames.clear()
 
     def to_csv(self, args: Namespace, path, add_note=False) -> None:
-        df = self.to_df(args, add_note)
-        df.to_csv(path, index=False)
+        """Write the data frame if we already have it, else stream the rows."""
+        df = self.frames.get(self.frame_key(args, add_note))
+        if df is None:
+            csv_writer.write(self, args, path, add_note)
+        else:
+            df.to_csv(path, index=False)
 
     def to_df(self, args: Namespace, add_note=False) -> pd.DataFrame:
-        records = self.to_records(add_note=add_note)
-        df = pd.DataFrame(records)
-        headers = self.field_order(df, args)
-        df = df[headers]
+        """Build the table's data frame once and share it.
+
+        Callers must not change the data frame, copy it first.
+        """
+        key = self.frame_key(args, add_note)
+        if (df := self.frames.get(key)) is None:
+            records = self.to_records(add_note=add_note)
+            df = pd.DataFrame(records)
+            headers = self.field_order(df.columns, args)
+            df = df[headers]
+            self.frames[key] = df
         return df
 
+    @staticmethod
+    def frame_key(args, add_note=False) -> tuple:
+        return args.group_by, args.row_key, args.user_column, add_note
+
     def to_records(self, add_note=False) -> list[dict]:
         as_recs = [r.to_dict(add_note, self.reconciled) for r in self.rows]
         return as_recs
 
     @staticmethod
-    def field_order(df, args):
+    def field_order(columns, args):
         """A hack to workaround Zooniverse random-ish column ordering."""
         first = (args.group_by, args.row_key, args.user_column)
 
-        temp = [(i, c) for i, c in enumerate(first) if c in df.columns]
+        temp = [(i, c) for i, c in enumerate(first) if c in columns]
         headers = [o[1] for o in temp]
 
-        headers += [c for c in df.columns if re.match(r"^[Tt](\d+)", c)]
-        headers += [c for c in df.columns if c and c not in headers]
+        headers += [c for c in columns if re.match(r"^[Tt](\d+)", c)]
+        headers += [c for c in columns if c and c not in headers]
 
         return headers
 
     def reconcile(self, args) -> "Table":
+        self.frames.clear()  # Reconciling may renumber this table's fields
+
         unrec_rows = sorted(self.rows, key=lambda r: r[args.group_by].value)
         groups = groupby(unrec_rows, key=lambda r: r[args.group_by].value)
         table = Table(reconciled=True)
 
-        for _, row_group in groups:
-            new_row = Row()
-            row_group = list(row_group)
-            row_count = len(row_group)
+        with ResultCache(args, self.types) as cache, Checkpoint(args) as checkpoint:
+            # Find the subjects that we have already reconciled
+            found = []
+            keyed = cache.store is not None or checkpoint.store is not None
+            for _, row_group in groups:
+                row_group = list(row_group)
+                key = cache.key(row_group) if keyed else None
+                new_row = checkpoint.get(key, row_group)
+                hit = new_row is not None
+                if new_row is None:
+                    new_row = cache.get(key, row_group)
+                found.append((row_group, key, new_row, hit))
+
+            # Reconcile some of the fields for the rest all at once
+            misses = [self.cap_rows(g, args) for g, _, r, _ in found if r is None]
+            batches = iter(self.batch_reconcile(misses, args))
+
+            for row_group, key, new_row, hit in found:
+                if new_row is None:
+                    new_row = self.reconcile_row(row_group, args, next(batches))
+                    cache.put(key, row_group, new_row)
+
+                if not hit:
+                    checkpoint.put(key, row_group, new_row)
+
+                table.add(new_row)
+
+        return table
 
-            used_field_sets = set()
+    def batch_reconcile(self, row_groups: list[list[Row]], args) -> list[dict]:
+        """Reconcile the fields that can be done for many subjects at once.
 
-            for field_name, default_field in self.types.items():
+        These are the controlled vocabulary fields and the fields with a
+        reconcile_batch() method. Returns the reconciled fields for each row group
+        keyed by the column name.
+        """
+        batches = batch_controlled_vocab(self.vocab_columns(), row_groups)
 
+        columns = defaultdict(list)
+        for i, row_group in enumerate(row_groups):
+            for field_name, default_field, group in self.task_groups(row_group, args):
                 if (
-                        default_field.field_set
-                        and default_field.field_set not in used_field_sets
+                    group
+                    and hasattr(default_field, "reconcile_batch")
+                    and not self.clustered(default_field, args)
                 ):
-                    group = []
+                    columns[field_name].append((i, group))
 
-                    for row in row_group:
-                        fields = []
-                        for f in row.fields.values():
-                            if f.field_set == default_field.field_set:
-                                fields.append(f)
-                        group.append(fields)
+        for field_name, items in columns.items():
+            groups = [g for _, g in items]
+            row_counts = [len(row_groups[i]) for i, _ in items]
+            results = self.types[field_name].reconcile_batch(groups, row_counts, args)
+            for (i, _), fields in zip(items, results):
+                batches[i][field_name] = fields
 
-                    used_field_sets.add(default_field.field_set)
+        return batches
 
-                elif default_field.field_set in used_field_sets:
-                    continue
+    def vocab_columns(self) -> dict[str, type]:
+        """Get the columns that batch_controlled_vocab() can reconcile."""
+        return {
+            n: type(f)
+            for n, f in self.types.items()
+            if isinstance(f, (SelectField, MarkIndexField)) and not f.field_set
+        }
 
-                else:
-                    group = [r[field_name] for r in row_group if r[field_name]]
+    @staticmethod
+    def cap_rows(row_group: list[Row], args) -> list[Row]:
+        """Limit the rows for subjects with too many classifications."""
+        if (cap := getattr(args, "max_per_subject", None)) and len(row_group) > cap:
+            return row_group[:cap]
+        return row_group
 
-                if not group:
-                    self.all_blank(default_field, new_row, row_count)
-                    continue
+    def reconcile_row(self, row_group: list[Row], args, batch=None) -> Row:
+        """Reconcile all the rows for one subject into a single row.
+
+        batch holds the fields that are already reconciled by batch_reconcile().
+        """
+        new_row = Row()
+        batch = batch if batch else {}
 
+        total = len(row_group)
+        row_group = self.cap_rows(row_group, args)
+        row_count = len(row_group)
+
+        for field_name, default_field, group in self.task_groups(row_group, args):
+            if not group:
+                self.all_blank(default_field, new_row, row_count)
+                continue
+
+            if field_name in batch:
+                fields = batch[field_name]
+            elif self.clustered(default_field, args):
+                fields = default_field.reconcile_clusters(group, row_count, args)
+                new_row.add(fields if fields else [])
+                self.blank_clusters(default_field, new_row, row_count)
+                continue
+            else:
                 fields = default_field.reconcile(group, row_count, args)
 
-                if fields is None:
-                    self.all_blank(default_field, new_row, row_count)
+            if fields is None:
+                self.all_blank(default_field, new_row, row_count)
+                continue
+
+            new_row.add(fields)
+
+        if row_count < total:
+            self.note_truncated(new_row, row_count, total)
+
+        return new_row
+
+    def task_groups(self, row_group: list[Row], args=None):
+        """Get the fields to reconcile together for each column or field set.
+
+        Marks that are clustered are grouped by their name instead of by column.
+        """
+        used_field_sets = set()
+        used_name_groups = set()
+
+        for field_name, default_field in self.types.items():
+
+            if (
+                    default_field.field_set
+                    and default_field.field_set not in used_field_sets
+            ):
+                group = []
+
+                for row in row_group:
+                    fields = []
+                    for f in row.fields.values():
+                        if f.field_set == default_field.field_set:
+                            fields.append(f)
+                    group.append(fields)
+
+                used_field_sets.add(default_field.field_set)
+
+            elif default_field.field_set in used_field_sets:
+                continue
+
+            elif self.clustered(default_field, args):
+                name_group = default_field.name_group
+                if name_group in used_name_groups:
                     continue
 
-                new_row.add(fields)
+                group = []
+                for row in row_group:
+                    group.append([
+                        f for f in row.fields.values()
+                        if type(f) is type(default_field) and f.name_group == name_group
+                    ])
 
-            table.add(new_row)
+                used_name_groups.add(name_group)
 
-        return table
+            else:
+                group = [r[field_name] for r in row_group if r[field_name]]
+
+            yield field_name, default_field, group
+
+    @staticmethod
+    def clustered(default_field, args) -> bool:
+        """Are we reconciling clusters of marks instead of columns of marks?"""
+        return bool(getattr(args, "cluster_marks", None)) and hasattr(
+            default_field, "reconcile_clusters"
+        )
+
+    def blank_clusters(self, default_field, new_row, row_count):
+        """Fill the columns for the marks that have fewer clusters than columns."""
+        for field_name, field in self.types.items():
+            if (
+                type(field) is type(default_field)
+                and field.name_group == default_field.name_group
+                and field_name not in new_row.fields
+            ):
+                self.all_blank(field, new_row, row_count)
+
+    @staticmethod
+    def note_truncated(new_row, row_count, total):
+        truncated = Note(
+            "Only the first {0} of {1} records were reconciled", row_count, total
+        )
+        for field in new_row.tasks:
+            if field.note:
+                field.note = Note("{0}. {1}", field.note, truncated)
+            else:
+                field.note = truncated
 
     @staticmethod
     def all_blank(default_field, new_row, row_count):
-        note = f"The {row_count} {P('record', row_count)} {P('is', row_count)} blank"
+        note = Note("The {0} {0:record} {0:is} blank", row_count)
         new_row.add(
             default_field.copy_name(
                 note=note,
@@ -123,7 +291,7 @@ class Table:
                 for i, key in enumerate(field_dict.keys()):
                     row_dict[key] = {
                         "flag": field.flag.value,
-                        "note": field.note,
+                        "note": str(field.note),
                         "span": len(field_dict),
                         "offset": i,
                     }
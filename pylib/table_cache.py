@@ -0,0 +1,334 @@
+"""Cache a parsed, unreconciled table in a compact columnar file.
+
+Parsing a large expedition export is expensive and we often rerun the same input
+with different reconciliation options. The cache file lives next to the input
+file and is only used when the input's fingerprint matches. The file layout is:
+
+    MAGIC
+    8 bytes: The length of the JSON header
+    JSON header: The fingerprint, workflow info, and where the arrays are
+    Arrays: Raw numpy arrays that are memory mapped on read
+
+Every field attribute is stored as a column of variants: a kind code, an 8 byte
+number (an int or a float's bits or a string index), and a shared string table.
+
+Loading builds every row of the tables at once. The memory map lets us skip
+reading the file into memory first, and each string is decoded straight from the
+map the first time a field uses it.
+"""
+import dataclasses
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from pylib.flag import Flag
+from pylib.note import Note
+from pylib.row import Row
+from pylib.row import BoxField
+from pylib.row import HighlightField
+from pylib.row import LengthField
+from pylib.row import MarkIndexField
+from pylib.row import NoOpField
+from pylib.row import PointField
+from pylib.row import PolygonField
+from pylib.row import SameField
+from pylib.row import SelectField
+from pylib.row import TextField
+from pylib.table import Table
+from pylib.utils import Point
+
+MAGIC = b"RECONCILE-TABLE-2\n"
+SUFFIX = ".table-cache"
+
+FIELD_TYPES = {
+    c.__name__: c
+    for c in (
+        BoxField,
+        HighlightField,
+        LengthField,
+        MarkIndexField,
+        NoOpField,
+        PointField,
+        PolygonField,
+        SameField,
+        SelectField,
+        TextField,
+    )
+}
+
+# Variant kinds
+STR, INT, FLOAT, BOOL, NONE, JSON, POINTS, FLAG = range(8)
+
+# These are the options that change how the input is parsed
+KEY_OPTIONS = """
+    reconciler_version format workflow_id workflow_name workflow_csv column_types
+    group_by row_key user_column join_distance
+    """.split()
+
+
+def read(args, reader) -> Table:
+    """Read the table from the cache or parse it with the reader & cache it."""
+    path = cache_path(args)
+    fingerprint = get_fingerprint(args)
+
+    if cached := load(path, fingerprint):
+        header, tables, _ = cached
+        args.workflow_id = header["workflow_id"]
+        args.workflow_name = header["workflow_name"]
+        return tables["unreconciled"]
+
+    table = reader(args)
+    header = {
+        "fingerprint": fingerprint,
+        "workflow_id": getattr(args, "workflow_id", None),
+        "workflow_name": getattr(args, "workflow_name", None),
+    }
+    dump(path, header, {"unreconciled": table})
+    return table
+
+
+def cache_path(args) -> Path:
+    name = Path(args.input_file).name
+    workflow = args.workflow_id if args.workflow_id else "all"
+    return Path(args.input_file).parent / f"{name}.{workflow}{SUFFIX}"
+
+
+def get_fingerprint(args) -> str:
+    """Identify the input files and the options used to parse them."""
+    fingerprint = {k: getattr(args, k, None) for k in KEY_OPTIONS}
+    for key in ("input_file", "workflow_csv"):
+        if path := getattr(args, key, None):
+            stat = os.stat(path)
+            path = str(Path(path).resolve())
+            fingerprint[key] = [path, stat.st_size, stat.st_mtime_ns]
+    return json.dumps(fingerprint, sort_keys=True, default=str)
+
+
+# #####################################################################################
+def dump(path, header: dict, tables: dict[str, Table], extras=None) -> None:
+    """Write tables and any extra numpy arrays to the file."""
+    strings = StringTable()
+    class_names = list(FIELD_TYPES)
+
+    arrays = {}
+    for table_name, table in tables.items():
+        arrays |= table_arrays(table_name, table, class_names, strings)
+    arrays |= {f"extra.{k}": v for k, v in (extras or {}).items()}
+
+    arrays["string_offsets"], arrays["string_blob"] = strings.arrays()
+
+    header = header | {
+        "class_names": class_names,
+        "tables": {k: {"reconciled": t.reconciled} for k, t in tables.items()},
+        "arrays": {},
+    }
+
+    offset = 0
+    for key, array in arrays.items():
+        offset = -(-offset // 8) * 8  # Keep the arrays aligned
+        header["arrays"][key] = [array.dtype.str, len(array), offset]
+        offset += array.nbytes
+
+    encoded = json.dumps(header, default=str).encode()
+
+    temp = Path(path).with_name(Path(path).name + ".tmp")
+    with open(temp, "wb") as out_file:
+        out_file.write(MAGIC)
+        out_file.write(struct.pack("<Q", len(encoded)))
+        out_file.write(encoded)
+        start = out_file.tell()
+        for key, array in arrays.items():
+            out_file.write(b"\0" * (start + header["arrays"][key][2] - out_file.tell()))
+            out_file.write(array.tobytes())
+    os.replace(temp, path)
+
+
+def table_arrays(table_name, table, class_names, strings) -> dict[str, np.ndarray]:
+    row_offsets = [0]
+    entry_classes = []
+    by_class = {n: [] for n in class_names}
+
+    for row in table.rows:
+        for field in row.fields.values():
+            name = field.__class__.__name__
+            entry_classes.append(class_names.index(name))
+            by_class[name].append(field)
+        row_offsets.append(len(entry_classes))
+
+    arrays = {
+        f"{table_name}.row_offsets": np.array(row_offsets, dtype=np.int64),
+        f"{table_name}.entry_classes": np.array(entry_classes, dtype=np.uint8),
+    }
+
+    for name, fields in by_class.items():
+        if not fields:
+            continue
+        for attr in dataclasses.fields(FIELD_TYPES[name]):
+            kinds, nums = encode([getattr(f, attr.name) for f in fields], strings)
+            arrays[f"{table_name}.{name}.{attr.name}.kinds"] = kinds
+            arrays[f"{table_name}.{name}.{attr.name}.nums"] = nums
+
+    return arrays
+
+
+def load(path, fingerprint=None):
+    """Read the header, tables, and extra arrays from the file."""
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    with open(path, "rb") as in_file:
+        if in_file.read(len(MAGIC)) != MAGIC:
+            return None
+        (size,) = struct.unpack("<Q", in_file.read(8))
+        header = json.loads(in_file.read(size))
+        if fingerprint is not None and header.get("fingerprint") != fingerprint:
+            return None
+        start = in_file.tell()
+        # The map is closed when the last array using it is garbage collected
+        buffer = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    arrays = {
+        k: np.frombuffer(buffer, dtype=d, count=n, offset=start + o)
+        for k, (d, n, o) in header["arrays"].items()
+    }
+    strings = StringReader(arrays["string_offsets"], arrays["string_blob"])
+    tables = {
+        k: build_table(k, v["reconciled"], header, arrays, strings)
+        for k, v in header["tables"].items()
+    }
+    extras = {
+        k.removeprefix("extra."): v.copy()
+        for k, v in arrays.items()
+        if k.startswith("extra.")
+    }
+
+    return header, tables, extras
+
+
+def build_table(table_name, reconciled, header, arrays, strings) -> Table:
+    class_names = header["class_names"]
+
+    fields_by_class = {}
+    for name in class_names:
+        prefix = f"{table_name}.{name}"
+        attrs = dataclasses.fields(FIELD_TYPES[name])
+        if f"{prefix}.{attrs[0].name}.kinds" not in arrays:
+            continue
+        columns = {}
+        for attr in attrs:
+            kinds = arrays[f"{prefix}.{attr.name}.kinds"]
+            nums = arrays[f"{prefix}.{attr.name}.nums"]
+            columns[attr.name] = decode(kinds, nums, strings)
+        cls = FIELD_TYPES[name]
+        fields = [cls(**dict(zip(columns, v))) for v in zip(*columns.values())]
+        fields_by_class[name] = iter(fields)
+
+    table = Table(reconciled=reconciled)
+    row_offsets = arrays[f"{table_name}.row_offsets"].tolist()
+    entry_classes = arrays[f"{table_name}.entry_classes"].tolist()
+    for begin, end in zip(row_offsets[:-1], row_offsets[1:]):
+        row = Row()
+        for class_idx in entry_classes[begin:end]:
+            field = next(fields_by_class[class_names[class_idx]])
+            suffix = field.suffix
+            row.add(field)
+            field.suffix = suffix  # Reconciling may renumber fields after adding
+        table.add(row)
+
+    return table
+
+
+# #####################################################################################
+class StringTable:
+    def __init__(self):
+        self.index = {}
+
+    def add(self, string: str) -> int:
+        return self.index.setdefault(string, len(self.index))
+
+    def arrays(self):
+        encoded = [s.encode("utf-8", "surrogatepass") for s in self.index]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(e) for e in encoded])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return offsets, blob
+
+
+class StringReader:
+    def __init__(self, offsets, blob):
+        self.offsets = offsets.tolist()
+        self.blob = memoryview(blob)  # Do not copy the mapped blob
+        self.cache = {}
+
+    def __getitem__(self, idx: int) -> str:
+        if (string := self.cache.get(idx)) is None:
+            begin, end = self.offsets[idx], self.offsets[idx + 1]
+            string = str(self.blob[begin:end], "utf-8", "surrogatepass")
+            self.cache[idx] = string
+        return string
+
+
+def encode(values, strings: StringTable):
+    kinds = np.zeros(len(values), dtype=np.uint8)
+    nums = np.zeros(len(values), dtype=np.int64)
+    for i, value in enumerate(values):
+        match value:
+            case str():
+                kinds[i], nums[i] = STR, strings.add(value)
+            case Note():
+                kinds[i], nums[i] = STR, strings.add(str(value))
+            case Flag():
+                kinds[i], nums[i] = FLAG, value.value
+            case bool():
+                kinds[i], nums[i] = BOOL, int(value)
+            case int() if -(2**63) <= value < 2**63:
+                kinds[i], nums[i] = INT, value
+            case float():
+                kinds[i] = FLOAT
+                nums[i] = struct.unpack("<q", struct.pack("<d", value))[0]
+            case None:
+                kinds[i] = NONE
+            case [Point(), *_]:
+                points = json.dumps([[p.x, p.y] for p in value])
+                kinds[i], nums[i] = POINTS, strings.add(points)
+            case _:
+                kinds[i], nums[i] = JSON, strings.add(json.dumps(value))
+    return kinds, nums
+
+
+# Decode the numbers of one kind in a column: (nums, floats, strings) -> values
+DECODERS = {
+    STR: lambda nums, _, strings: [strings[n] for n in nums],
+    INT: lambda nums, _, __: nums,
+    FLOAT: lambda _, floats, __: floats,
+    BOOL: lambda nums, _, __: [bool(n) for n in nums],
+    NONE: lambda nums, _, __: [None] * len(nums),
+    JSON: lambda nums, _, strings: [json.loads(strings[n]) for n in nums],
+    POINTS: lambda nums, _, strings: [
+        [Point(x, y) for x, y in json.loads(strings[n])] for n in nums
+    ],
+    FLAG: lambda nums, _, __: [Flag(n) for n in nums],
+}
+
+
+def decode(kinds, nums, strings: StringReader) -> list:
+    """Decode a column one kind at a time, most columns only have one kind."""
+    floats = nums.view(np.float64)
+    present = np.unique(kinds).tolist()
+    if len(present) == 1:
+        return DECODERS[present[0]](nums.tolist(), floats.tolist(), strings)
+
+    values = [None] * len(kinds)
+    for kind in present:
+        where = np.flatnonzero(kinds == kind)
+        decoded = DECODERS[kind](
+            nums[where].tolist(), floats[where].tolist(), strings
+        )
+        for i, value in zip(where.tolist(), decoded):
+            values[i] = value
+    return values
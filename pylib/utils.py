@@ -1,36 +1,60 @@
+import functools
+import importlib
 import sys
 from collections import namedtuple
-from importlib import util as i_util
+from collections.abc import Mapping
 from pathlib import Path
 from types import ModuleType
 
-import inflect
+Point = namedtuple("Point", "x y")
 
-E = inflect.engine()
-E.defnoun("The", "All")
-P = E.plural
 
-Point = namedtuple("Point", "x y")
+@functools.cache
+def engine():
+    """Build the inflect engine when it is first needed, it is slow to import."""
+    import inflect
 
+    engine_ = inflect.engine()
+    engine_.defnoun("The", "All")
+    return engine_
 
-def get_plugins(subdir) -> dict[str, ModuleType]:
-    """Get plug-ins from a directory."""
-    dir_ = Path(__file__).parent / subdir
 
-    plugins = {}
+@functools.lru_cache(maxsize=None)  # Notes reuse the same few words
+def P(word: str, count=None) -> str:
+    return engine().plural(word, count)
+
+
+class Plugins(Mapping):
+    """Plug-ins from a directory. A plug-in is only imported when it is used."""
 
     exclude = ["__init__", "common"]
 
-    for path in [p for p in dir_.glob("*.py") if p.stem not in exclude]:
-        module_name = f"pylib.{subdir}.{path.name}"
-        spec = i_util.spec_from_file_location(module_name, str(path))
-        if spec is None:
-            error_exit(f"Could not find spec '{spec}'")
-        module = i_util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        plugins[path.stem] = module
+    def __init__(self, subdir: str):
+        self.subdir = subdir
+        dir_ = Path(__file__).parent / subdir
+        self.names = sorted(
+            p.stem for p in dir_.glob("*.py") if p.stem not in self.exclude
+        )
+
+    def __getitem__(self, name: str) -> ModuleType:
+        if name not in self.names:
+            raise KeyError(name)
+        return importlib.import_module(f"pylib.{self.subdir}.{name}")
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def get_plugins(subdir) -> Plugins:
+    """Get plug-ins from a directory."""
+    return Plugins(subdir)
+
 
-    return plugins
+class ReconcileError(Exception):
+    """Errors in the input data or options that stop a reconciliation."""
 
 
 def error_exit(msgs):
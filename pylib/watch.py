@@ -0,0 +1,108 @@
+"""Reconcile the exports that land in a drop directory as they arrive.
+
+Every export is a new snapshot of the classifications, so the output files are
+rebuilt from the newest export. Most of its subjects are unchanged since the
+last export. They are keyed in the result cache, so only the new or changed
+subjects are reconciled again. Each output file is written to a temporary file
+next to it and then moved into place, so readers never see a partial file.
+"""
+import os
+import sys
+import tempfile
+import time
+import traceback
+from argparse import Namespace
+from itertools import count
+from pathlib import Path
+
+from pylib import utils
+
+PATTERNS = {"nfn": "*.csv", "csv": "*.csv", "json": "*.json"}
+OUTPUT_ARGS = ["unreconciled", "reconciled", "summary"]
+
+
+def watch(args, runner, polls=None, file=None) -> None:
+    """Reconcile new or changed exports with runner(args) until interrupted.
+
+    A file is only used once it has stopped changing between two polls, so we
+    do not read an export that is still being copied into the directory.
+    """
+    file = file if file else sys.stdout
+    args = Namespace(**vars(args))  # The result cache below is only for this call
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if not args.result_cache:
+            args.result_cache = str(Path(temp_dir) / "result-cache")
+
+        # The outputs may be in the same directory as the exports
+        outputs = {Path(p).resolve() for k in OUTPUT_ARGS if (p := getattr(args, k))}
+
+        done, before = {}, {}
+        try:
+            for poll in count() if polls is None else range(polls):
+                if poll:
+                    time.sleep(args.watch_interval)
+
+                now = signatures(args.watch, PATTERNS[args.format], outputs)
+                ready = {
+                    p: s for p, s in now.items() if before.get(p) == s != done.get(p)
+                }
+                before = now
+
+                if ready:
+                    done |= ready
+                    newest = max(ready, key=lambda p: ready[p])
+                    update(args, newest, runner, file)
+
+        except KeyboardInterrupt:
+            pass
+
+
+def signatures(dir_, pattern, skip=()) -> dict[Path, tuple[int, int]]:
+    """Get the modified time & size of the files, they change with the file."""
+    sigs = {}
+    for path in Path(dir_).glob(pattern):
+        if path.name.startswith(".") or path.resolve() in skip:
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:  # It was removed after the glob
+            continue
+        sigs[path] = (stat.st_mtime_ns, stat.st_size)
+    return sigs
+
+
+def update(args, path: Path, runner, file) -> bool:
+    """Reconcile the export and replace the output files if it works."""
+    job = Namespace(**vars(args))
+    job.input_file = str(path)
+    job.watch = None
+
+    temps = {}
+    for key in OUTPUT_ARGS:
+        if dest := getattr(args, key):
+            dest = Path(dest)
+            handle, temp = tempfile.mkstemp(
+                dir=dest.parent, prefix=f".{dest.stem}.", suffix=dest.suffix
+            )
+            os.close(handle)
+            temps[key] = temp
+            setattr(job, key, temp)
+
+    try:
+        runner(job)
+        for key, temp in temps.items():
+            os.replace(temp, getattr(args, key))
+    except utils.ReconcileError as err:
+        print(f"{path.name}: {err}", file=sys.stderr)
+        return False
+    except Exception:  # pylint: disable=broad-except
+        traceback.print_exc()
+        return False
+    finally:
+        for temp in temps.values():
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} Reconciled {path.name}", file=file)
+    return True
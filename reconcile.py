@@ -1,20 +1,21 @@
 #!/usr/bin/env python3
 import argparse
+import functools
 import os
+import sys
 import textwrap
 import warnings
 import zipfile
 from os.path import basename
 
-from pylib import summary
+from pylib import options
 from pylib import utils
-from pylib.table import Table
 
 
-VERSION = "0.8.4"
+VERSION = options.VERSION
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv=None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         formatter_class=argparse.RawDescriptionHelpFormatter,
         fromfile_prefix_chars="@",
@@ -48,7 +49,12 @@ def parse_args() -> argparse.Namespace:
         ),
     )
 
-    parser.add_argument("input_file", metavar="INPUT-FILE", help="""The input file.""")
+    parser.add_argument(
+        "input_file",
+        nargs="?",
+        metavar="INPUT-FILE",
+        help="""The input file. It is required unless you --watch a directory.""",
+    )
 
     parser.add_argument(
         "-u",
@@ -104,6 +110,16 @@ def parse_args() -> argparse.Namespace:
             See https://github.com/seatgeek/fuzzywuzzy.""",
     )
 
+    parser.add_argument(
+        "--sweep-fuzzy-ratio",
+        type=options.thresholds_arg,
+        metavar="LIST",
+        help="""Reconcile with each of these fuzzy ratio thresholds, like 70,80,90,
+            and print a comparison of the flag counts for each field. The fuzzy
+            scores are only calculated once. If there is a --reconciled file then
+            write one for each threshold, like reconciled.ratio-80.csv.""",
+    )
+
     parser.add_argument(
         "--fuzzy-set-threshold",
         default=50,
@@ -112,6 +128,78 @@ def parse_args() -> argparse.Namespace:
             See https://github.com/seatgeek/fuzzywuzzy.""",
     )
 
+    parser.add_argument(
+        "--fuzzy-backend",
+        choices=options.FUZZY_BACKENDS,
+        default="fuzzywuzzy",
+        help="""How to calculate the fuzzy match scores. The rapidfuzz backend is
+            much faster for large groups of transcripts but its partial ratio
+            scores can differ slightly from fuzzywuzzy's. It requires the optional
+            rapidfuzz module. (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "--fuzzy-workers",
+        default=1,
+        type=int,
+        help="""The number of threads the rapidfuzz backend uses to calculate fuzzy
+            match scores. (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "--fuzzy-block-size",
+        default=options.FUZZY_BLOCK_SIZE,
+        type=int,
+        metavar="N",
+        help="""Text fields with more than this many records in a subject only
+            fuzzy match strings that look alike or that hold one another, instead
+            of every pair of strings. This is much faster for large subjects but it
+            may pick a different match when no pair matches exactly. Use 0 to always
+            compare every pair. (default: %(default)s, off)""",
+    )
+
+    parser.add_argument(
+        "--fuzzy-cache-size",
+        default=options.FUZZY_CACHE_SIZE,
+        type=int,
+        metavar="N",
+        help="""Keep up to this many fuzzy match scores for pairs of strings that
+            are seen again in other subjects. The cache is set up once for the
+            whole process, so this is ignored for jobs sent to
+            reconcile_service.py and for nfn_export.py expeditions.
+            (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "--fuzzy-cache-stats",
+        action="store_true",
+        help="""Print the fuzzy match score cache's hit rate after reconciling. Use
+            this to size the --fuzzy-cache-size. Jobs in reconcile_service.py
+            share the cache, so their hit rates include the other jobs.""",
+    )
+
+    parser.add_argument(
+        "--cluster-marks",
+        type=float,
+        metavar="DISTANCE",
+        help="""Reconcile point and box marks by clustering them instead of by
+            column. Marks that are within this many pixels of each other (box
+            centers for boxes) are in the same cluster. There will be one
+            reconciled mark for each cluster. Use this when volunteers mark
+            several things on a subject.""",
+    )
+
+    parser.add_argument(
+        "--polygon-grid",
+        default=options.POLYGON_GRID,
+        type=int,
+        metavar="CELLS",
+        help="""Polygons are reconciled by drawing them on a grid and finding the
+            area that most of them cover. This is the number of grid cells on the
+            longest side. More cells are more precise but slower.
+            (default: %(default)s)""",
+    )
+
     parser.add_argument(
         "--join-distance",
         default=6,
@@ -120,6 +208,15 @@ def parse_args() -> argparse.Namespace:
             single text (default: %(default)s).""",
     )
 
+    parser.add_argument(
+        "--max-per-subject",
+        type=int,
+        metavar="N",
+        help="""Only reconcile the first N classifications for a subject. This keeps
+            subjects with hundreds of classifications, like test subjects, from
+            dominating the run time. The explanations note when this happens.""",
+    )
+
     parser.add_argument(
         "--workflow-csv",
         default="",
@@ -132,7 +229,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "-f",
         "--format",
-        choices=["nfn", "csv", "json"],
+        choices=options.FORMATS,
         default="nfn",
         help="""The unreconciled data is in what type of file? nfn=A Zooniverse
             classification data dump. csv=A flat CSV file. json=A JSON file. When the
@@ -173,22 +270,156 @@ def parse_args() -> argparse.Namespace:
         help="""Skip the Reconciliation Detail section in the summary report.""",
     )
 
+    parser.add_argument(
+        "--result-cache",
+        metavar="PATH",
+        help="""Keep reconciled subjects in this cache file. Later runs will reuse
+            the cached results for subjects whose classifications and reconciliation
+            options have not changed.""",
+    )
+
+    parser.add_argument(
+        "--table-cache",
+        action="store_true",
+        help="""Save the parsed input file in a cache file next to it. Later runs with
+            the same input file and parsing options will read the cache file instead
+            of parsing the input file again.""",
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        metavar="PATH",
+        help="""Periodically save the reconciled subjects to this file so that an
+            interrupted run can be resumed with --resume.""",
+    )
+
+    parser.add_argument(
+        "--checkpoint-every",
+        default=100,
+        type=int,
+        metavar="N",
+        help="""Save the checkpoint after every N subjects. (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="""Resume an interrupted run from its --checkpoint file. Subjects that
+            were already reconciled are read from the checkpoint.""",
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=options.shard_arg,
+        metavar="I/N",
+        help="""Only reconcile the subjects that fall into shard I of N shards. This
+            lets you split a large reconciliation across machines. You must also use
+            --shard-file. Use merge_shards.py to merge all of the shard files.""",
+    )
+
+    parser.add_argument(
+        "--shard-file",
+        metavar="PATH",
+        help="""Write the reconciliation data for this shard to this file.""",
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="""Reconcile the subjects in chunks on --pipeline-workers threads and
+            write the unreconciled file while they are reconciled. The input file
+            is still read in full before reconciling starts, and the threads share
+            Python's global lock, so the speedup is small.""",
+    )
+
+    parser.add_argument(
+        "--pipeline-workers",
+        default=2,
+        type=int,
+        metavar="N",
+        help="""The number of threads that reconcile subjects in a --pipeline.
+            (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "--watch",
+        metavar="DIR",
+        help="""Watch this directory for new or changed export files instead of
+            reading an INPUT-FILE. Each time an export arrives the output files are
+            rebuilt from it and replaced in place. Only the subjects that are new or
+            changed since the last export are reconciled again. Stop it with
+            Ctrl-C.""",
+    )
+
+    parser.add_argument(
+        "--watch-interval",
+        default=10.0,
+        type=float,
+        metavar="SECONDS",
+        help="""How often to look for new exports in the --watch directory.
+            (default: %(default)s)""",
+    )
+
     parser.add_argument(
         "-V", "--version", action="version", version=f"%(prog)s {VERSION}"
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     setattr(args, "row_key", "classification_id")
     setattr(args, "user_column", "user_name")
     setattr(args, "max_transcriptions", 50)
-    setattr(args, "format", f"{args.format}_format")
-
-    if args.fuzzy_ratio_threshold < 0 or args.fuzzy_ratio_threshold > 100:
-        utils.error_exit("--fuzzy-ratio-threshold must be between 0 and 100.")
-
-    if args.fuzzy_set_threshold < 0 or args.fuzzy_set_threshold > 100:
-        utils.error_exit("--fuzzy-set-threshold must be between 0 and 100.")
+    setattr(args, "reconciler_version", VERSION)
+
+    if errors := options.check(args):
+        utils.error_exit(errors)
+
+    if args.fuzzy_cache_size < 0:
+        utils.error_exit("--fuzzy-cache-size must not be negative.")
+
+    if bool(args.shard) != bool(args.shard_file):
+        utils.error_exit("--shard and --shard-file must be used together.")
+
+    if args.sweep_fuzzy_ratio and (args.summary or args.shard or args.checkpoint):
+        utils.error_exit(
+            "--sweep-fuzzy-ratio cannot be used with --summary, --shard, "
+            "or --checkpoint."
+        )
+
+    if args.sweep_fuzzy_ratio and args.zip:
+        utils.error_exit("--sweep-fuzzy-ratio cannot be used with --zip.")
+
+    if bool(args.input_file) == bool(args.watch):
+        utils.error_exit("Give either an INPUT-FILE or a --watch directory.")
+
+    if args.watch and not os.path.isdir(args.watch):
+        utils.error_exit(f"--watch directory '{args.watch}' does not exist.")
+
+    if args.watch and (
+        args.zip or args.shard or args.checkpoint or args.sweep_fuzzy_ratio
+    ):
+        utils.error_exit(
+            "--watch cannot be used with --zip, --shard, --checkpoint, "
+            "or --sweep-fuzzy-ratio."
+        )
+
+    if args.pipeline and (
+        args.result_cache
+        or args.checkpoint
+        or args.shard
+        or args.sweep_fuzzy_ratio
+        or args.watch
+    ):
+        utils.error_exit(
+            "--pipeline cannot be used with --result-cache, --checkpoint, --shard, "
+            "--sweep-fuzzy-ratio, or --watch."
+        )
+
+    if args.pipeline_workers < 1:
+        utils.error_exit("--pipeline-workers must be at least 1.")
+
+    if args.watch_interval <= 0:
+        utils.error_exit("--watch-interval must be greater than 0.")
 
     if args.format == "nfn" and args.column_types:
         warnings.warn("Column types are ignored for 'nfn' format.")
@@ -218,28 +449,107 @@ def zip_files(args):
 
 def main():
     args = parse_args()
+    try:
+        start(args)
+    except utils.ReconcileError as err:
+        utils.error_exit(str(err))
+
+
+def start(args):
+    """Watch a directory for exports or reconcile the input file.
 
-    formats = utils.get_plugins("formats")
-    unreconciled: Table = formats[args.format].read(args)
+    This starts the process, so it sizes the fuzzy match score cache that all of
+    the process's jobs share. Jobs from run() or the API do not change it.
+    """
+    if args.fuzzy_cache_size != options.FUZZY_CACHE_SIZE:
+        from pylib.fields import fuzzy_scores
 
-    if len(unreconciled) == 0:
-        utils.error_exit(f"Workflow {args.workflow_id} has no data.")
+        fuzzy_scores.set_cache_size(args.fuzzy_cache_size)
+
+    if args.watch:
+        from pylib import watch
+
+        watch.watch(args, run)
+    else:
+        run(args)
+
+
+def run(args, stdout=None, stderr=None, df=None):
+    """Read the input file, reconcile it, and write the output files.
+
+    Callers that already parsed the input file can pass its data frame.
+    """
+    # Only import the modules that this run needs, some of them are slow to import
+    from pylib import api
+
+    read_table = functools.partial(api.read_table, df=df)
+
+    if args.table_cache:
+        from pylib import table_cache
+
+        read_table = functools.partial(table_cache.read, reader=read_table)
+
+    if args.pipeline:
+        run_pipeline(args, read_table, stderr)
+        return
+
+    unreconciled = read_table(args)
+
+    if args.shard:
+        from pylib import shards
+
+        unreconciled, positions = shards.select(args, unreconciled)
 
     if args.unreconciled:
         unreconciled.to_csv(args, args.unreconciled)
 
-    if args.reconciled or args.summary:
+    if args.sweep_fuzzy_ratio:
+        from pylib import sweep
+
+        results = sweep.sweep(args, unreconciled)
+        sweep.report(args, results, file=stdout)
+
+    elif args.reconciled or args.summary or args.shard:
+        from pylib.fields import fuzzy_scores
+
         reconciled = unreconciled.reconcile(args)
 
+        if args.fuzzy_cache_stats:
+            print(fuzzy_scores.cache_stats(), file=stderr if stderr else sys.stderr)
+
+        if args.shard:
+            shards.write(args, unreconciled, reconciled, positions)
+
         if args.reconciled:
             reconciled.to_csv(args, args.reconciled, args.explanations)
 
         if args.summary:
+            from pylib import summary
+
             summary.report(args, unreconciled, reconciled)
 
     if args.zip:
         zip_files(args)
 
 
+def run_pipeline(args, read_table, stderr=None):
+    """Reconcile the tables on a thread pool, see pylib/pipeline.py."""
+    from pylib import pipeline
+    from pylib.fields import fuzzy_scores
+
+    unreconciled, reconciled = pipeline.run(args, read_table)
+
+    if args.fuzzy_cache_stats:
+        print(fuzzy_scores.cache_stats(), file=stderr if stderr else sys.stderr)
+
+    if args.summary:
+        from pylib import summary
+
+        summary.report(args, unreconciled, reconciled)
+
+    if args.zip:
+        zip_files(args)
+
+
 if __name__ == "__main__":
     main()
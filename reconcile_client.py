@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Send a reconcile.py job to reconcile_service.py.
+
+This takes the same arguments as reconcile.py. When the service is not running,
+or when it is watching a directory, the job is run here instead. Set
+RECONCILE_SERVICE to the service's address if it is not the default, and
+RECONCILE_SERVICE_TOKEN to its --token-file if that is not the default.
+"""
+import sys
+from urllib.error import HTTPError
+
+from pylib import service
+from pylib import utils
+from reconcile import parse_args
+from reconcile import start
+
+
+def main():
+    args = parse_args()
+
+    try:
+        result = None if args.watch else service.submit(args)
+    except HTTPError as err:
+        utils.error_exit(f"The service did not take the job: {err.reason}")
+
+    if result is None:
+        try:
+            start(args)
+        except utils.ReconcileError as err:
+            utils.error_exit(str(err))
+        return
+
+    sys.stdout.write(result["stdout"])
+    sys.stderr.write(result["stderr"])
+    sys.exit(result["status"])
+
+
+if __name__ == "__main__":
+    main()
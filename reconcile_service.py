@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+import argparse
+import textwrap
+
+from pylib import options
+from pylib import service
+from reconcile import VERSION
+from reconcile import run
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        fromfile_prefix_chars="@",
+        description=textwrap.dedent(
+            """
+            Run a local service that reconciles jobs from reconcile_client.py.
+            The service keeps its modules and caches warm between jobs, so it
+            saves the startup cost of running reconcile.py for every job."""
+        ),
+    )
+
+    parser.add_argument(
+        "--host",
+        default=service.HOST,
+        help="""Listen on this address. (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "--port",
+        default=service.PORT,
+        type=int,
+        help="""Listen on this port. (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "--workers",
+        default=2,
+        type=int,
+        metavar="N",
+        help="""Run up to this many jobs at the same time. (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "--token-file",
+        help=f"""Write the token that jobs must send to this file. Only you can
+            read it. Set {service.TOKEN_VAR} to the same file for
+            reconcile_client.py. (default: {service.TOKEN_FILE})""",
+    )
+
+    parser.add_argument(
+        "--fuzzy-cache-size",
+        default=options.FUZZY_CACHE_SIZE,
+        type=int,
+        metavar="N",
+        help="""Keep up to this many fuzzy match scores for pairs of strings. All
+            jobs share the cache, so the jobs' own --fuzzy-cache-size is ignored.
+            (default: %(default)s)""",
+    )
+
+    args = parser.parse_args()
+
+    if args.fuzzy_cache_size < 0:
+        parser.error("--fuzzy-cache-size must not be negative.")
+
+    return args
+
+
+def main():
+    args = parse_args()
+    service.serve(
+        run,
+        args.host,
+        args.port,
+        args.workers,
+        VERSION,
+        args.fuzzy_cache_size,
+        args.token_file,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=textwrap.dedent(
+            """
+            Time how long reconcile.py takes to start up. Batch jobs run it
+            thousands of times so the startup time adds up. This times a
+            --version run and a reconciliation of a tiny input file."""
+        ),
+    )
+
+    parser.add_argument(
+        "--input-file",
+        default=ROOT / "tests" / "data" / "nfn1.csv",
+        type=Path,
+        metavar="PATH",
+        help="""Reconcile this small input file. (default: %(default)s)""",
+    )
+
+    parser.add_argument(
+        "--repeat",
+        default=10,
+        type=int,
+        metavar="N",
+        help="""Run each command this many times. (default: %(default)s)""",
+    )
+
+    args = parser.parse_args()
+    return args
+
+
+def time_command(command: list[str], repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    args = parse_args()
+
+    reconcile = [sys.executable, str(ROOT / "reconcile.py")]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        commands = {
+            "--version": reconcile + ["--version"],
+            "tiny run": reconcile
+            + [str(args.input_file), "-r", str(Path(temp_dir) / "reconciled.csv")],
+        }
+
+        print(f"{'command':<12} {'min':>8} {'median':>8}")
+        for name, command in commands.items():
+            times = time_command(command, args.repeat)
+            print(f"{name:<12} {min(times):8.3f} {statistics.median(times):8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,3 +23,16 @@ class TestBoxField(unittest.TestCase):
                 bottom=40,
             ),
         )
+
+    def test_reconcile_02(self):
+        """It rounds means at the halfway point like statistics.mean does."""
+        group = [
+            BoxField(left=0.1, top=0, right=0.5, bottom=1),
+            BoxField(left=0.2, top=0, right=1.5, bottom=2),
+            BoxField(left=1.2, top=1, right=2.5, bottom=3),
+        ]
+        actual = BoxField.reconcile_batch([group, group[1:]], [3, 2])
+        self.assertEqual(
+            [(b.left, b.top, b.right, b.bottom) for b in actual],
+            [(0, 0, 2, 2), (1, 0, 2, 2)],
+        )
@@ -0,0 +1,77 @@
+import unittest
+from argparse import Namespace
+
+from pylib.fields.base_field import Flag
+from pylib.fields.box_field import BoxField
+from pylib.fields.clusters import cluster
+from pylib.fields.point_field import PointField
+
+
+class TestClusters(unittest.TestCase):
+    def test_cluster_01(self):
+        """It links chains of nearby points across grid cells."""
+        points = [(0, 0), (100, 100), (9, 0), (18, 0), (105, 95), (200, 0)]
+        self.assertEqual(cluster(points, 10), [[0, 2, 3], [1, 4], [5]])
+
+    def test_cluster_02(self):
+        """It handles no points."""
+        self.assertEqual(cluster([], 10), [])
+
+    def test_reconcile_clusters_01(self):
+        """It reconciles one point per cluster of marks."""
+        args = Namespace(cluster_marks=20)
+        group = [
+            [PointField(name="p", x=10, y=10), PointField(name="p", x=300, y=10)],
+            [PointField(name="p", x=302, y=14), PointField(name="p", x=12, y=12)],
+            [PointField(name="p", x=600, y=600)],
+        ]
+        actual = PointField.reconcile_clusters(group, len(group), args)
+        self.assertEqual(
+            actual,
+            [
+                PointField(
+                    name="p",
+                    note="Cluster of 2 point marks from 2 of 3 records",
+                    flag=Flag.OK,
+                    x=11,
+                    y=11,
+                ),
+                PointField(
+                    name="p",
+                    note="Cluster of 2 point marks from 2 of 3 records",
+                    flag=Flag.OK,
+                    x=301,
+                    y=12,
+                ),
+                PointField(
+                    name="p",
+                    note="Cluster of 1 point mark from 1 of 3 records",
+                    flag=Flag.ONLY_ONE,
+                    x=600,
+                    y=600,
+                ),
+            ],
+        )
+
+    def test_reconcile_clusters_02(self):
+        """It clusters boxes by their centers."""
+        args = Namespace(cluster_marks=20)
+        group = [
+            [BoxField(name="b", left=0, right=100, top=0, bottom=50)],
+            [BoxField(name="b", left=10, right=100, top=0, bottom=60)],
+        ]
+        actual = BoxField.reconcile_clusters(group, len(group), args)
+        self.assertEqual(
+            actual,
+            [
+                BoxField(
+                    name="b",
+                    note="Cluster of 2 box marks from 2 of 2 records",
+                    flag=Flag.OK,
+                    left=5,
+                    right=100,
+                    top=0,
+                    bottom=55,
+                )
+            ],
+        )
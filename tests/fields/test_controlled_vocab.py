@@ -0,0 +1,45 @@
+import random
+import unittest
+
+from pylib.fields.controlled_vocab import batch_controlled_vocab
+from pylib.fields.mark_index_field import MarkIndexField
+from pylib.fields.select_field import SelectField
+from pylib.row import Row
+
+
+def build_row_groups(seed):
+    rand = random.Random(seed)
+    row_groups = []
+    for _ in range(50):
+        row_group = []
+        for _ in range(rand.randint(1, 6)):
+            row = Row()
+            if rand.random() < 0.9:
+                row.add(SelectField(name="select", value=rand.choice("  aabc")))
+            if rand.random() < 0.5:
+                row.add(MarkIndexField(name="mark", value=rand.choice("xyz"), index=1))
+            row_group.append(row)
+        row_groups.append(row_group)
+    return row_groups
+
+
+class TestControlledVocab(unittest.TestCase):
+    def test_batch_controlled_vocab_01(self):
+        """It reconciles like each field class does on its own."""
+        columns = {"select_1": SelectField, "mark_1": MarkIndexField}
+        for seed in range(5):
+            row_groups = build_row_groups(seed)
+            actual = batch_controlled_vocab(columns, row_groups)
+
+            for row_group, result in zip(row_groups, actual):
+                for name, cls in columns.items():
+                    group = [r[name] for r in row_group if r[name]]
+                    if not group:
+                        self.assertNotIn(name, result)
+                        continue
+                    expect = cls.reconcile(group, len(row_group))
+                    self.assertEqual(result[name], expect)
+
+    def test_batch_controlled_vocab_02(self):
+        """It handles subjects without any fields."""
+        self.assertEqual(batch_controlled_vocab({"select_1": SelectField}, []), [])
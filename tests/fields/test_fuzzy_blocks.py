@@ -0,0 +1,65 @@
+import random
+import unittest
+from argparse import Namespace
+from itertools import combinations
+
+from pylib.fields import fuzzy_blocks
+from pylib.fields import text_field
+from pylib.fields.text_field import TextField
+
+WORDS = """
+    alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike
+    november oscar papa quebec romeo sierra tango uniform victor whiskey xray
+    """.split()
+
+VALUES = [f"{a} {b} {c}" for a, b, c in zip(WORDS, WORDS[3:], WORDS[7:])]
+
+
+class TestFuzzyBlocks(unittest.TestCase):
+    def test_candidate_pairs_01(self):
+        """It compares every pair in small groups."""
+        args = Namespace(fuzzy_block_size=50)
+        pairs = fuzzy_blocks.candidate_pairs(VALUES, args)
+        self.assertEqual(pairs, list(combinations(range(len(VALUES)), 2)))
+
+    def test_candidate_pairs_02(self):
+        """It compares every pair when blocking is off."""
+        args = Namespace(fuzzy_block_size=0)
+        pairs = fuzzy_blocks.candidate_pairs(VALUES, args)
+        self.assertEqual(pairs, list(combinations(range(len(VALUES)), 2)))
+
+    def test_candidate_pairs_03(self):
+        """It keeps similar pairs and drops most dissimilar ones."""
+        values = VALUES + ["alpha delta hotel", "", "", "Alpha  Delta Hotel!"]
+        args = Namespace(fuzzy_block_size=5)
+        pairs = fuzzy_blocks.candidate_pairs(values, args)
+
+        self.assertEqual(pairs, sorted(pairs))
+        self.assertEqual(pairs, fuzzy_blocks.candidate_pairs(values, args))
+        self.assertIn((0, len(VALUES)), pairs)
+        self.assertIn((0, len(VALUES) + 3), pairs)
+        self.assertIn((len(VALUES) + 1, len(VALUES) + 2), pairs)
+        self.assertLess(len(pairs), len(values) * (len(values) - 1) // 4)
+
+    def test_candidate_pairs_04(self):
+        """It finds strings inside other strings, they score 100."""
+        rng = random.Random(7)
+        for _ in range(20):
+            values = [" ".join(rng.sample(WORDS, 4)).title() for _ in range(60)]
+            long = f"Parish of {values[0]} of America"
+            values += ["Louisiana", "Parish of Saint Louis Louisiana United States"]
+            values += [values[1].split()[2], long]
+            rng.shuffle(values)
+
+            blocked = Namespace(fuzzy_block_size=5, fuzzy_ratio_threshold=90)
+            everything = Namespace(fuzzy_block_size=0, fuzzy_ratio_threshold=90)
+            group = [TextField(value=v) for v in values]
+            with self.subTest(values=values):
+                self.assertEqual(
+                    text_field.best_partial_ratio(values, 90, blocked),
+                    text_field.best_partial_ratio(values, 90, everything),
+                )
+                self.assertEqual(
+                    text_field.top_token_set_ratio(group, blocked),
+                    text_field.top_token_set_ratio(group, everything),
+                )
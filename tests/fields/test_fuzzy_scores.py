@@ -0,0 +1,85 @@
+import unittest
+from argparse import Namespace
+from itertools import combinations
+
+from fuzzywuzzy import fuzz
+
+from pylib.fields import fuzzy_scores
+
+VALUES = [
+    "",
+    "Good test right here",
+    "good test",
+    "",
+    "right here good test",
+    "Good test right here",
+    "Ünïcode café_test",
+]
+
+
+class TestFuzzyScores(unittest.TestCase):
+    def test_score_pairs_01(self):
+        """It scores every pair like fuzzywuzzy does."""
+        scores = fuzzy_scores.score_pairs(VALUES, fuzzy_scores.PARTIAL_RATIO)
+        for i, j in combinations(range(len(VALUES)), 2):
+            self.assertEqual(scores[i, j], fuzz.partial_ratio(VALUES[i], VALUES[j]))
+
+    def test_score_pairs_02(self):
+        """It scores every pair like fuzzywuzzy does."""
+        scores = fuzzy_scores.score_pairs(VALUES, fuzzy_scores.TOKEN_SET_RATIO)
+        for i, j in combinations(range(len(VALUES)), 2):
+            self.assertEqual(
+                scores[i, j], fuzz.token_set_ratio(VALUES[i], VALUES[j])
+            )
+
+    @unittest.skipUnless(fuzzy_scores.HAS_RAPIDFUZZ, "rapidfuzz is not installed")
+    def test_score_pairs_03(self):
+        """The rapidfuzz backend gets the same token set ratios as fuzzywuzzy."""
+        args = Namespace(fuzzy_backend="rapidfuzz", fuzzy_workers=2)
+        scores = fuzzy_scores.score_pairs(
+            VALUES, fuzzy_scores.TOKEN_SET_RATIO, args
+        )
+        for i, j in combinations(range(len(VALUES)), 2):
+            self.assertEqual(
+                scores[i, j], fuzz.token_set_ratio(VALUES[i], VALUES[j])
+            )
+
+    @unittest.skipUnless(fuzzy_scores.HAS_RAPIDFUZZ, "rapidfuzz is not installed")
+    def test_score_pairs_04(self):
+        """The rapidfuzz backend handles blank and identical strings like fuzzywuzzy."""
+        args = Namespace(fuzzy_backend="rapidfuzz", fuzzy_workers=1)
+        scores = fuzzy_scores.score_pairs(VALUES, fuzzy_scores.PARTIAL_RATIO, args)
+        self.assertEqual(scores[0, 1], 0)
+        self.assertEqual(scores[0, 3], 100)
+        self.assertEqual(scores[1, 5], 100)
+
+    def test_set_cache_size_01(self):
+        """It reuses pair scores from earlier groups."""
+        fuzzy_scores.set_cache_size(100)
+        fuzzy_scores.score_pairs(["a test", "A Test"], fuzzy_scores.TOKEN_SET_RATIO)
+        fuzzy_scores.score_pairs(["a test!", "a test"], fuzzy_scores.TOKEN_SET_RATIO)
+        info = fuzzy_scores.cached_pair_score.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+        fuzzy_scores.set_cache_size(fuzzy_scores.CACHE_SIZE)
+
+    def test_partial_ratio_bounds_01(self):
+        """The bounds are never below the actual partial ratios."""
+        values = VALUES + ["abcd", "xxxxbcd", "dcba", "ab", "aabbccdd"]
+        bounds = fuzzy_scores.partial_ratio_bounds(values)
+        for i, j in combinations(range(len(values)), 2):
+            score = fuzz.partial_ratio(values[i], values[j])
+            self.assertGreaterEqual(bounds[i, j], score)
+
+    def test_score_pairs_05(self):
+        """It only scores the given pairs."""
+        for backend in ("fuzzywuzzy", "rapidfuzz"):
+            if backend == "rapidfuzz" and not fuzzy_scores.HAS_RAPIDFUZZ:
+                continue
+            with self.subTest(backend=backend):
+                args = Namespace(fuzzy_backend=backend, fuzzy_workers=1)
+                scores = fuzzy_scores.score_pairs(
+                    VALUES, fuzzy_scores.TOKEN_SET_RATIO, args, [(1, 4), (2, 5)]
+                )
+                self.assertEqual(scores, {(1, 4): 100, (2, 5): 100})
+        bounds = fuzzy_scores.partial_ratio_bounds(VALUES, [(0, 3)])
+        self.assertEqual(bounds, {(0, 3): 100})
@@ -271,3 +271,25 @@ class TestHighlighterField(unittest.TestCase):
         self.assertEqual(group[0][0].field_name, "T01_highlighter_collector_1")
         self.assertEqual(group[1][0].field_name, "T01_highlighter_collector_1")
         self.assertEqual(group[1][1].field_name, "T01_highlighter_collector_1.1")
+
+    def test_align_json_fields_01(self):
+        """It merges touching highlights and assigns suffixes within each span."""
+        group = [
+            [
+                HighlightField(name="h", start=10, end=14, text="b"),
+                HighlightField(name="h", start=0, end=4, text="a"),
+            ],
+            [
+                HighlightField(name="h", start=2, end=6, text="c"),
+                HighlightField(name="h", start=6, end=8, text="d"),
+                HighlightField(name="h", start=20, end=20, text="e"),
+            ],
+        ]
+        aligned = HighlightField.align_json_fields(group)
+        self.assertEqual(list(aligned), [(0, 8), (10, 14)])
+        self.assertEqual(
+            [(h.start, h.end, h.text) for h in aligned[(0, 8)]],
+            [(0, 4, "a"), (2, 8, "c d")],
+        )
+        self.assertEqual([h.suffix for h in group[0]], [2, 1])
+        self.assertEqual([h.suffix for h in group[1]], [1, 1.1, 0])
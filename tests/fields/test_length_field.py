@@ -94,3 +94,26 @@ class TestLengthField(unittest.TestCase):
             ),
         ]
         self.assertEqual(actual, expect)
+
+    def test_reconcile_batch_01(self):
+        """It reconciles each subject's rulers separately."""
+        groups = [
+            [
+                [
+                    LengthField(name="Length", x1=0.0, y1=0.0, x2=20.0, y2=0.0),
+                    LengthField(name="1 mm", x1=0.0, y1=0.0, x2=10.0, y2=0.0),
+                ],
+            ],
+            [[LengthField(name="Length", x1=0.0, y1=0.0, x2=30.0, y2=0.0)]],
+            [
+                [
+                    LengthField(name="Length", x1=0.0, y1=0.0, x2=30.0, y2=0.0),
+                    LengthField(name="2 cm", x1=0.0, y1=0.0, x2=10.0, y2=0.0),
+                ],
+            ],
+        ]
+        actual = LengthField.reconcile_batch(groups, [1, 1, 1])
+        self.assertEqual(
+            [[(f.length, f.units) for f in s] for s in actual],
+            [[(2.0, "mm"), (0.0, "mm")], [(0.0, "")], [(6.0, "cm"), (0.0, "cm")]],
+        )
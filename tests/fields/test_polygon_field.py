@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+
+from pylib.fields import polygons
+from pylib.fields.base_field import Flag
+from pylib.fields.polygon_field import PolygonField
+from pylib.utils import Point
+
+
+def square(left, top, size):
+    return [
+        Point(left, top),
+        Point(left + size, top),
+        Point(left + size, top + size),
+        Point(left, top + size),
+    ]
+
+
+class TestPolygonField(unittest.TestCase):
+    def test_reconcile_01(self):
+        """It keeps a lone polygon."""
+        group = [PolygonField(points=square(0, 0, 10))]
+        self.assertEqual(
+            PolygonField.reconcile(group, row_count=2),
+            PolygonField(
+                note="There is 1 of 2 polygon records",
+                flag=Flag.OK,
+                points=square(0, 0, 10),
+            ),
+        )
+
+    def test_reconcile_02(self):
+        """It finds the area inside most of the polygons."""
+        group = [
+            PolygonField(points=square(0, 0, 100)),
+            PolygonField(points=square(0, 0, 100)),
+            PolygonField(points=square(50, 50, 100)),
+        ]
+        actual = PolygonField.reconcile(group, row_count=len(group))
+        self.assertEqual(actual.note, "Majority area of 3 of 3 polygon records")
+        self.assertEqual(
+            sorted((round(p.x), round(p.y)) for p in actual.points),
+            [(0, 0), (0, 100), (100, 0), (100, 100)],
+        )
+
+    def test_reconcile_03(self):
+        """It flags polygons that do not overlap."""
+        group = [
+            PolygonField(points=square(0, 0, 10)),
+            PolygonField(points=square(50, 50, 10)),
+        ]
+        actual = PolygonField.reconcile(group, row_count=len(group))
+        self.assertEqual(actual.flag, Flag.NO_MATCH)
+        self.assertEqual(actual.points, [])
+
+    def test_reconcile_04(self):
+        """The majority is out of every record, not just the usable polygons."""
+        group = [
+            PolygonField(points=square(0, 0, 10)),
+            PolygonField(points=[Point(0, 0), Point(10, 10)]),
+            PolygonField(points=[Point(0, 0), Point(10, 10)]),
+        ]
+        actual = PolygonField.reconcile(group, row_count=len(group))
+        self.assertEqual(actual.flag, Flag.NO_MATCH)
+        self.assertEqual(actual.points, [])
+
+    def test_consensus_01(self):
+        """A thin majority area is still a polygon."""
+        shapes = [np.array(square(0, 0, s), dtype=np.float64) for s in (1, 1, 128)]
+        outline = polygons.consensus(shapes)
+        self.assertGreaterEqual(len(outline), 3)
+        self.assertEqual(outline.min(axis=0).tolist(), [0.0, 0.0])
+        self.assertEqual(outline.max(axis=0).tolist(), [1.0, 1.0])
+
+    def test_simplify_vertices_01(self):
+        """It simplifies polygons with too many vertices."""
+        angles = np.linspace(0, 2 * np.pi, 5000, endpoint=False)
+        circle = np.c_[500 + 300 * np.cos(angles), 400 + 300 * np.sin(angles)]
+        actual = polygons.simplify_vertices(circle, max_vertices=100)
+        self.assertLessEqual(len(actual), 100)
+        radii = np.hypot(actual[:, 0] - 500, actual[:, 1] - 400)
+        self.assertTrue(np.allclose(radii, 300))
@@ -179,3 +179,17 @@ class TestTextField(unittest.TestCase):
                 flag=Flag.NO_MATCH,
             ),
         )
+
+    def test_keys_01(self):
+        """It normalizes the value once without changing it."""
+        field = TextField(value="  A  Test, label. ")
+        self.assertEqual(field.exact_key, "A Test, label.")
+        self.assertEqual(field.normalized_key, "atestlabel")
+        self.assertEqual(field.value, "  A  Test, label. ")
+
+    def test_keys_02(self):
+        """It treats a missing value as blank."""
+        field = TextField(value=None)
+        self.assertEqual(field.value, "")
+        self.assertEqual(field.exact_key, "")
+        self.assertEqual(field.normalized_key, "")
@@ -0,0 +1,20 @@
+"""Build small tables for the tests."""
+from pylib.fields.same_field import SameField
+from pylib.fields.text_field import TextField
+from pylib.row import Row
+from pylib.table import Table
+
+
+def build_table(rows, extra=None) -> Table:
+    """Build a table with a row for each (subject_id, text) pair.
+
+    extra(i) gives any other fields for the i-th row.
+    """
+    table = Table()
+    for i, (subject_id, text) in enumerate(rows):
+        row = Row()
+        row.add(SameField(name="subject_id", value=subject_id))
+        row.add(TextField(name="text", value=text))
+        row.add(extra(i) if extra else [])
+        table.add(row)
+    return table
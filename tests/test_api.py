@@ -0,0 +1,84 @@
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+import reconcile
+from pylib.api import reconcile_dataframe
+from pylib.api import reconcile_file
+from pylib.fields import fuzzy_scores
+from pylib.options import Options
+from pylib.utils import ReconcileError
+
+
+def build_df(i):
+    return pd.DataFrame(
+        {
+            "subject_id": ["1", "1", "1", "2", "2"],
+            "text": ["Good test", "good test", "Good test", "alpha", f"zeta {i}"],
+            "choice": ["a", "a", "b", "c", "c"],
+        }
+    )
+
+
+OPTIONS = Options(format="csv", column_types=["text:text,choice:select"])
+
+
+class TestApi(unittest.TestCase):
+    def test_reconcile_file_01(self):
+        """It does not change the caller's options."""
+        options = Options()
+        result = reconcile_file("tests/data/nfn1.csv", options)
+        self.assertEqual(result.options.workflow_id, "1001")
+        self.assertIsNone(options.workflow_id)
+        self.assertEqual(len(result.reconciled_df()), 2)
+
+    def test_reconcile_dataframe_01(self):
+        """It reconciles a data frame."""
+        df = reconcile_dataframe(build_df(0), OPTIONS).reconciled_df()
+        self.assertEqual(df["text_1"].tolist(), ["Good test", ""])
+        self.assertEqual(df["choice_1"].tolist(), ["a", "c"])
+
+    def test_reconcile_dataframe_02(self):
+        """Jobs in threads get the same results as jobs run one at a time."""
+        expect = [
+            reconcile_dataframe(build_df(i), OPTIONS).reconciled_df(True)
+            for i in range(8)
+        ]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = executor.map(
+                lambda i: reconcile_dataframe(build_df(i), OPTIONS), range(8)
+            )
+            actual = [r.reconciled_df(True) for r in results]
+        for expect_df, actual_df in zip(expect, actual):
+            pd.testing.assert_frame_equal(expect_df, actual_df)
+
+    def test_validate_01(self):
+        """It raises an error for bad options."""
+        with self.assertRaises(ReconcileError):
+            reconcile_dataframe(build_df(0), Options(fuzzy_ratio_threshold=101))
+
+    def test_write_01(self):
+        """The summary does not change the data frames that the tables share."""
+        result = reconcile_file("tests/data/nfn1.csv")
+        unreconciled = result.unreconciled.to_df(result.options)
+        reconciled = result.reconciled.to_df(result.options)
+        columns = (list(unreconciled.columns), list(reconciled.columns))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            result.write(summary=Path(temp_dir) / "summary.html")
+        self.assertIs(result.reconciled.to_df(result.options), reconciled)
+        self.assertEqual(
+            (list(unreconciled.columns), list(reconciled.columns)), columns
+        )
+
+    def test_cache_01(self):
+        """Jobs share the fuzzy score cache and do not replace it."""
+        cache = fuzzy_scores.cached_pair_score
+        with tempfile.TemporaryDirectory() as temp_dir:
+            reconciled = str(Path(temp_dir) / "reconciled.csv")
+            argv = ["tests/data/nfn1.csv", "-r", reconciled, "--fuzzy-cache-size", "7"]
+            reconcile.run(reconcile.parse_args(argv))
+        reconcile_dataframe(build_df(0), OPTIONS)
+        self.assertIs(fuzzy_scores.cached_pair_score, cache)
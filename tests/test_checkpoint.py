@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+
+from pylib.checkpoint import Checkpoint
+from tests.helpers import build_table
+
+ROWS = [(f"{i // 2:02d}", f"text {i % 3}") for i in range(20)]
+
+
+class TestCheckpoint(unittest.TestCase):
+    def test_checkpoint_01(self):
+        """It resumes from a checkpoint that was cut off in the middle."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "checkpoint"
+            args = Namespace(
+                group_by="subject_id",
+                fuzzy_ratio_threshold=90,
+                fuzzy_set_threshold=50,
+                checkpoint=str(path),
+                checkpoint_every=1,
+                resume=False,
+            )
+            expect = build_table(ROWS).reconcile(args)
+
+            os.truncate(path, path.stat().st_size // 2)
+
+            args.resume = True
+            table = build_table(ROWS)
+            with Checkpoint(args) as checkpoint:
+                resumed = len(checkpoint.store)
+
+            actual = table.reconcile(args)
+
+            self.assertTrue(0 < resumed < len(expect))
+            self.assertEqual(actual.rows, expect.rows)
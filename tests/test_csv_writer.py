@@ -0,0 +1,90 @@
+import random
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pylib import csv_writer
+from pylib.table import Table
+
+ARGS = Namespace(group_by="subject_id", row_key="classification_id", user_column="")
+
+
+class FakeRow:
+    def __init__(self, row_dict):
+        self.row_dict = row_dict
+
+    def to_dict(self, _add_note=False, _reconciled=False):
+        return dict(self.row_dict)
+
+
+def pandas_csv(table) -> str:
+    return table.to_df(ARGS).to_csv(index=False)
+
+
+def streamed_csv(table) -> str:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "table.csv"
+        csv_writer.write(table, ARGS, path)
+        with open(path, newline="", encoding="utf-8") as in_file:
+            return in_file.read()
+
+
+class TestCsvWriter(unittest.TestCase):
+    def assert_same(self, row_dicts):
+        table = Table(rows=[FakeRow(d) for d in row_dicts])
+        self.assertEqual(streamed_csv(table), pandas_csv(table))
+
+    def test_write_01(self):
+        """Ints with blanks are written as floats, like pandas."""
+        self.assert_same(
+            [
+                {"subject_id": "1", "T1: x": 5, "T1: y": 6},
+                {"subject_id": "2", "T1: x": 7},
+            ]
+        )
+
+    def test_write_02(self):
+        """It quotes and orders the columns like pandas."""
+        self.assert_same(
+            [
+                {"other": "a", "T2: text": 'say "hi", \nthen go', "subject_id": "1"},
+                {"T1: text": "b", "subject_id": "2", "classification_id": "9"},
+            ]
+        )
+
+    def test_write_03(self):
+        """Mixed types are written like pandas writes them."""
+        values = [
+            1,
+            -2,
+            0.1,
+            1e-7,
+            1e16,
+            12.0,
+            np.float64(2.5),
+            np.int64(3),
+            True,
+            None,
+            float("nan"),
+            "",
+            "text",
+        ]
+        rng = random.Random(42)
+        for _ in range(200):
+            columns = [f"T{i}: x" for i in range(4)]
+            row_dicts = []
+            for _ in range(rng.randint(1, 5)):
+                row = {"subject_id": str(rng.randint(1, 9))}
+                for column in columns:
+                    if rng.random() < 0.8:
+                        row[column] = rng.choice(values)
+                row_dicts.append(row)
+            self.assert_same(row_dicts)
+
+    def test_write_04(self):
+        """An empty table."""
+        self.assertEqual(streamed_csv(Table()), pd.DataFrame().to_csv(index=False))
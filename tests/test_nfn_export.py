@@ -0,0 +1,83 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+import nfn_export
+import reconcile
+from nfn_export import Entry
+from pylib.utils import ReconcileError
+
+EXPORT = "tests/data/nfn2.csv"
+
+
+class TestNfnExport(unittest.TestCase):
+    def run_batch(self, entries, output_dir):
+        with contextlib.redirect_stdout(io.StringIO()):
+            with contextlib.redirect_stderr(io.StringIO()):
+                return nfn_export.run_batch(
+                    entries, "1.0", output_dir, nfn_export.HELP_PDF
+                )
+
+    def test_run_batch_01(self):
+        """It writes the same folders and files that nfn_export.bash did."""
+        entries = [
+            Entry(export=EXPORT, workflow_id="1001", name="first"),
+            Entry(export=EXPORT, workflow_id="2001", name="second"),
+        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_dir = Path(temp_dir)
+            failures = self.run_batch(entries, output_dir)
+            self.assertEqual(failures, 0)
+            self.assertEqual(
+                sorted(p.name for p in (output_dir / "1001_first").iterdir()),
+                [
+                    "1001_first.raw_transcripts.1.0.csv",
+                    "1001_first.reconciled.1.0.csv",
+                    "1001_first.summary.1.0.html",
+                    "1001_first.unreconciled.1.0.csv",
+                    "NfN_Reconciliation_HelpV1.0.pdf",
+                ],
+            )
+            self.assertTrue((output_dir / "2001_second").is_dir())
+
+    def test_run_batch_02(self):
+        """A shared export gives the same output as reconciling the file."""
+        entries = [
+            Entry(export=EXPORT, workflow_id="1001", name="first"),
+            Entry(export=EXPORT, workflow_id="2001", name="second"),
+        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_dir = Path(temp_dir)
+            self.run_batch(entries, output_dir)
+            expect = output_dir / "expect.csv"
+            argv = [EXPORT, "-w", "2001", "-r", str(expect)]
+            reconcile.run(reconcile.parse_args(argv))
+            actual = output_dir / "2001_second" / "2001_second.reconciled.1.0.csv"
+            self.assertEqual(actual.read_text(), expect.read_text())
+
+    def test_run_batch_03(self):
+        """A failed expedition does not stop the others."""
+        entries = [
+            Entry(export=EXPORT, workflow_id="9999", name="missing"),
+            Entry(export=EXPORT, workflow_id="1001", name="first"),
+        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_dir = Path(temp_dir)
+            failures = self.run_batch(entries, output_dir)
+            self.assertEqual(failures, 1)
+            self.assertTrue(
+                (output_dir / "1001_first" / "1001_first.reconciled.1.0.csv").exists()
+            )
+
+    def test_read_manifest_01(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "manifest.csv"
+            path.write_text(
+                "export,workflow_id,name,args\n"
+                f'{EXPORT},1001,first,"--page-size 10"\n'
+                f"{EXPORT},2001,,\n"
+            )
+            with self.assertRaisesRegex(ReconcileError, "line 3 is missing: name"):
+                nfn_export.read_manifest(path)
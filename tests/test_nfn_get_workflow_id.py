@@ -1,10 +1,10 @@
 import unittest
 from argparse import Namespace
-from unittest.mock import patch
 
 import pandas as pd
 
 from pylib.formats import nfn_format
+from pylib.utils import ReconcileError
 
 
 class TestGetWorkflowId(unittest.TestCase):
@@ -33,15 +33,16 @@ class TestGetWorkflowId(unittest.TestCase):
 
         assert workflow_id == "1001"
 
-    @patch("pylib.utils.error_exit")
-    def test_get_workflow_id_03(self, error_exit):
+    def test_get_workflow_id_03(self):
         """It errors when there are multiple workflow IDs to choose."""
         _, df2 = self.setup_dataframes()
         args = Namespace(workflow_id=None)
 
-        nfn_format.get_workflow_id(args, df2)
+        with self.assertRaises(ReconcileError) as context:
+            nfn_format.get_workflow_id(args, df2)
 
-        error_exit.assert_called_once_with(
+        self.assertEqual(
+            str(context.exception),
             "There are multiple workflows in this file. "
-            "You must provide a workflow ID as an argument."
+            "You must provide a workflow ID as an argument.",
         )
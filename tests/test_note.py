@@ -0,0 +1,45 @@
+import pickle
+import unittest
+from unittest.mock import patch
+
+from pylib import note
+from pylib.note import Note
+
+
+class TestNote(unittest.TestCase):
+    def test_note_01(self):
+        """It pluralizes words by their counts."""
+        note = Note("Match {0} of {1} {1:record} with {2} {2:blank}", 1, 3, 1)
+        self.assertEqual(str(note), "Match 1 of 3 records with 1 blank")
+
+    def test_note_02(self):
+        """It compares equal to its text."""
+        note = Note("The {0} {0:record} {0:is} blank", 2)
+        self.assertEqual(note, "The 2 records are blank")
+        self.assertEqual("The 2 records are blank", note)
+        self.assertEqual(note, Note("The {0} {0:record} {0:is} blank", 2))
+        self.assertNotEqual(note, "The 1 record is blank")
+
+    def test_note_03(self):
+        """It formats notes inside of other notes."""
+        note = Note("{0}. {1}", Note("There {0:is} {0} box {0:record}", 1), "Done")
+        self.assertEqual(f"{note}", "There is 1 box record. Done")
+
+    def test_note_04(self):
+        """It pickles the template and counts."""
+        note = Note("Only 1 transcript in {0} {0:record}", 4)
+        copy = pickle.loads(pickle.dumps(note))
+        self.assertEqual(copy.counts, (4,))
+        self.assertEqual(copy, "Only 1 transcript in 4 records")
+
+    def test_note_05(self):
+        """It tests, hashes, and shows a note without building its text."""
+        empty = Note("{0}{1}", "", Note(""))
+        with patch.object(note, "render", side_effect=AssertionError):
+            self.assertTrue(Note("{0} {0:record}", 0))
+            self.assertTrue(Note("{0}", Note("{0}", "x")))
+            self.assertFalse(empty)
+            self.assertFalse(Note(""))
+            self.assertEqual(len({Note("{0}", 1), Note("{0}", 1), Note("{0}", 2)}), 2)
+            self.assertEqual(repr(Note("{0}. {1}", 1, "a")), "Note('{0}. {1}', 1, 'a')")
+        self.assertEqual(str(empty), "")
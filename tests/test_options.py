@@ -0,0 +1,44 @@
+import argparse
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from pylib import options
+
+ROOT = Path(__file__).parents[1]
+
+# These modules are slow to import and are not needed to parse the arguments
+HEAVY = """inflect jinja2 numpy pandas plotly fuzzywuzzy""".split()
+
+
+class TestOptions(unittest.TestCase):
+    def test_shard_arg_01(self):
+        """It parses a shard argument."""
+        self.assertEqual(options.shard_arg("2/4"), (2, 4))
+
+    def test_shard_arg_02(self):
+        """It rejects a shard that is out of range."""
+        with self.assertRaises(argparse.ArgumentTypeError):
+            options.shard_arg("5/4")
+
+    def test_thresholds_arg_01(self):
+        """It parses and sorts the thresholds."""
+        self.assertEqual(options.thresholds_arg("90,70, 80,90"), [70, 80, 90])
+
+    def test_startup_01(self):
+        """It parses the arguments without importing heavy modules."""
+        code = (
+            "import sys; import reconcile; "
+            "sys.argv = ['reconcile.py', 'input.csv']; reconcile.parse_args(); "
+            "print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        loaded = set(result.stdout.split())
+        self.assertEqual(loaded & set(HEAVY), set())
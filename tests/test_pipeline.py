@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import reconcile
+from pylib import api
+from pylib import pipeline
+from pylib.utils import ReconcileError
+
+EXPORT = "tests/data/nfn1.csv"
+HIGHLIGHTS = "tests/data/nfn_highlights.csv"  # Reconciling renumbers these fields
+
+
+class TestPipeline(unittest.TestCase):
+    def outputs(self, export, *extra):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            unrec = Path(temp_dir) / "unreconciled.csv"
+            rec = Path(temp_dir) / "reconciled.csv"
+            argv = [export, "-u", str(unrec), "-r", str(rec), "-e", *extra]
+            reconcile.run(reconcile.parse_args(argv))
+            return unrec.read_text(), rec.read_text()
+
+    def test_run_01(self):
+        """It writes the same files as a plain run."""
+        for export in (EXPORT, HIGHLIGHTS):
+            with self.subTest(export=export):
+                actual = self.outputs(export, "--pipeline")
+                self.assertEqual(actual, self.outputs(export))
+
+    def test_run_02(self):
+        """The subjects stay in order when the chunks finish out of order."""
+        for export in (EXPORT, HIGHLIGHTS):
+            with self.subTest(export=export), patch.object(pipeline, "CHUNK", 1):
+                actual = self.outputs(export, "--pipeline", "--pipeline-workers", "3")
+                self.assertEqual(actual, self.outputs(export))
+
+    def test_run_03(self):
+        """An error in a stage stops the pipeline and is raised."""
+
+        def read_table(args):
+            raise ReconcileError("Workflow 1 has no data.")
+
+        args = reconcile.parse_args([EXPORT, "--pipeline"])
+        with self.assertRaisesRegex(ReconcileError, "no data"):
+            pipeline.run(args, read_table)
+
+    def test_run_04(self):
+        """It returns the same tables as a plain run."""
+        args = reconcile.parse_args([EXPORT, "--pipeline"])
+        unreconciled, reconciled = pipeline.run(args, api.read_table)
+        expect = api.read_table(reconcile.parse_args([EXPORT]))
+        self.assertEqual(len(unreconciled), len(expect))
+        expect = expect.reconcile(args).to_df(args)
+        self.assertEqual(reconciled.to_df(args).to_dict(), expect.to_dict())
@@ -0,0 +1,80 @@
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+
+from pylib.fields.text_field import TextField
+from pylib.result_cache import ResultCache
+from tests.helpers import build_table
+
+
+def build_args(path, **kwargs):
+    args = Namespace(
+        group_by="subject_id",
+        result_cache=str(path),
+        fuzzy_ratio_threshold=90,
+        fuzzy_set_threshold=50,
+        join_distance=6,
+        reconciler_version="0.0.0",
+    )
+    for key, value in kwargs.items():
+        setattr(args, key, value)
+    return args
+
+
+class TestResultCache(unittest.TestCase):
+    def test_result_cache_01(self):
+        """It reuses the reconciled rows from an earlier run."""
+        values = [("1", "same"), ("1", "same"), ("2", "one"), ("2", "two")]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            args = build_args(Path(temp_dir) / "cache")
+            first = build_table(values).reconcile(args)
+
+            table = build_table(values)
+            with ResultCache(args, table.types) as cache:
+                groups = [table.rows[:2], table.rows[2:]]
+                hits = [cache.get(cache.key(g), g) for g in groups]
+
+            self.assertEqual(hits, first.rows)
+
+    def test_result_cache_02(self):
+        """It does not reuse rows when a subject has changed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            args = build_args(Path(temp_dir) / "cache")
+            build_table([("1", "same"), ("1", "same")]).reconcile(args)
+
+            table = build_table([("1", "same"), ("1", "changed")])
+            with ResultCache(args, table.types) as cache:
+                group = table.rows
+                self.assertIsNone(cache.get(cache.key(group), group))
+
+    def test_result_cache_03(self):
+        """It does not reuse rows when the options have changed."""
+        values = [("1", "same"), ("1", "same")]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            args = build_args(Path(temp_dir) / "cache")
+            build_table(values).reconcile(args)
+
+            args = build_args(Path(temp_dir) / "cache", fuzzy_ratio_threshold=80)
+            table = build_table(values)
+            with ResultCache(args, table.types) as cache:
+                group = table.rows
+                self.assertIsNone(cache.get(cache.key(group), group))
+
+    def test_result_cache_04(self):
+        """It does not reuse rows from an export with other columns."""
+        values = [("1", "same"), ("1", "same"), ("2", "one")]
+
+        def other(i):
+            return [TextField(name="other", value="new")] if i == 2 else []
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            args = build_args(Path(temp_dir) / "cache")
+            build_table(values[:2]).reconcile(args)
+
+            actual = build_table(values, other).reconcile(args)
+            args.result_cache = None
+            expect = build_table(values, other).reconcile(args)
+
+            self.assertEqual(actual.rows, expect.rows)
+            self.assertIn("other_1", actual.rows[0].fields)
@@ -0,0 +1,106 @@
+import os
+import stat
+import tempfile
+import threading
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from urllib import request as url_request
+from urllib.error import HTTPError
+
+import reconcile
+from pylib import service
+from pylib.utils import ReconcileError
+
+
+def runner(args, stdout, stderr):
+    if args.input_file.endswith("bad.csv"):
+        raise ReconcileError("Workflow 1 has no data.")
+    Path(args.reconciled).write_text(args.input_file)
+    print("done", file=stdout)
+
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.token_file = Path(self.temp_dir.name) / "token"
+        token = service.write_token(self.token_file)
+        self.server = service.make_server(runner, token, port=0, workers=2)
+        self.address = f"http://{service.HOST}:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server.pool.shutdown()
+        self.thread.join()
+        self.temp_dir.cleanup()
+
+    def submit(self, args):
+        return service.submit(args, self.address, self.token_file)
+
+    def post(self, body, headers):
+        request = url_request.Request(
+            f"{self.address}/jobs", data=body, headers=headers
+        )
+        opener = url_request.build_opener(url_request.ProxyHandler({}))
+        with self.assertRaises(HTTPError) as context:
+            opener.open(request)
+        context.exception.close()
+        return context.exception.code
+
+    def test_submit_01(self):
+        """The service runs the job and returns what it printed and wrote."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            reconciled = str(Path(temp_dir) / "reconciled.csv")
+            args = Namespace(input_file="input.csv", reconciled=reconciled)
+            result = self.submit(args)
+            self.assertEqual(result["status"], 0)
+            self.assertEqual(result["stdout"], "done\n")
+            self.assertEqual(result["outputs"], [reconciled])
+            self.assertEqual(
+                Path(reconciled).read_text(), str(Path("input.csv").resolve())
+            )
+
+    def test_submit_02(self):
+        """It returns the errors from a job."""
+        args = Namespace(input_file="bad.csv", reconciled=None)
+        result = self.submit(args)
+        self.assertEqual(result["status"], 1)
+        self.assertEqual(result["stderr"], "Workflow 1 has no data.\n")
+
+    def test_submit_03(self):
+        """It is None when the service is not running."""
+        self.server.shutdown()
+        self.server.server_close()
+        args = Namespace(input_file="input.csv", reconciled=None)
+        self.assertIsNone(self.submit(args))
+
+    def test_submit_04(self):
+        """It rejects a job that is not a JSON object."""
+        headers = {service.TOKEN_HEADER: self.token_file.read_text()}
+        for body in (b'{"input_file": "input', b"[1, 2]", b"\xff"):
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body, headers), 400)
+
+    def test_submit_05(self):
+        """It rejects jobs without the token, which only this user can read."""
+        mode = stat.S_IMODE(os.stat(self.token_file).st_mode)
+        self.assertEqual(mode, 0o600)
+        body = b'{"input_file": "input.csv", "reconciled": null}'
+        self.assertEqual(self.post(body, {}), 403)
+        self.assertEqual(self.post(body, {service.TOKEN_HEADER: "guess"}), 403)
+
+    def test_submit_06(self):
+        """It runs a real reconciliation like reconcile.py."""
+        self.server.runner = reconcile.run
+        with tempfile.TemporaryDirectory() as temp_dir:
+            actual = Path(temp_dir) / "actual.csv"
+            expect = Path(temp_dir) / "expect.csv"
+            argv = ["tests/data/nfn1.csv", "-e", "-r"]
+            result = self.submit(reconcile.parse_args(argv + [str(actual)]))
+            reconcile.run(reconcile.parse_args(argv + [str(expect)]))
+            self.assertEqual(result["status"], 0, result["stderr"])
+            self.assertEqual(result["outputs"], [str(actual)])
+            self.assertEqual(actual.read_text(), expect.read_text())
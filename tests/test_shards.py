@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+
+from pylib import shards
+from pylib.fields.noop_field import NoOpField
+from pylib.utils import ReconcileError
+from tests.helpers import build_table
+
+ROWS = [(s, f"text {i % 2}") for i, s in enumerate("3 1 2 1 3 2 4".split())]
+
+
+def classification_id(i):
+    return NoOpField(name="classification_id", value=str(i))
+
+
+class TestShards(unittest.TestCase):
+    def test_merge_01(self):
+        """It merges shards into the same tables as a single run."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "input.csv"
+            input_file.write_text("input")
+            args = Namespace(
+                input_file=str(input_file),
+                group_by="subject_id",
+                fuzzy_ratio_threshold=90,
+                fuzzy_set_threshold=50,
+            )
+
+            expect_unreconciled = build_table(ROWS, classification_id)
+            expect_reconciled = expect_unreconciled.reconcile(args)
+
+            paths = []
+            for i in range(1, 4):
+                args.shard = (i, 3)
+                args.shard_file = Path(temp_dir) / f"shard{i}"
+                table = build_table(ROWS, classification_id)
+                unreconciled, positions = shards.select(args, table)
+                reconciled = unreconciled.reconcile(args)
+                shards.write(args, unreconciled, reconciled, positions)
+                paths.append(args.shard_file)
+
+            _, unreconciled, reconciled = shards.merge(paths)
+
+            with self.assertRaisesRegex(ReconcileError, "one file for each"):
+                shards.merge(paths[:2])
+
+            self.assertEqual(unreconciled.rows, expect_unreconciled.rows)
+            self.assertEqual(reconciled.rows, expect_reconciled.rows)
@@ -0,0 +1,46 @@
+import unittest
+from argparse import Namespace
+
+from pylib import sweep
+from tests.helpers import build_table
+
+VALUES = [
+    ["Good test right here", "good test right her", "Something else"],
+    ["Good test", "Good text", "Good tests"],
+    ["alpha beta gamma", "alpha beta gama delta", "zeta"],
+]
+
+ROWS = [(f"{i:02d}", value) for i, values in enumerate(VALUES) for value in values]
+
+
+class TestSweep(unittest.TestCase):
+    def test_sweep_01(self):
+        """It gets the same results as separate runs."""
+        args = Namespace(
+            group_by="subject_id",
+            fuzzy_ratio_threshold=90,
+            fuzzy_set_threshold=50,
+            sweep_fuzzy_ratio=[60, 90, 100],
+        )
+        results = sweep.sweep(args, build_table(ROWS))
+
+        for threshold, actual in results.items():
+            run_args = Namespace(
+                group_by="subject_id",
+                fuzzy_ratio_threshold=threshold,
+                fuzzy_set_threshold=50,
+            )
+            expect = build_table(ROWS).reconcile(run_args)
+            self.assertEqual(actual.rows, expect.rows)
+
+    def test_flag_counts_01(self):
+        """It counts the flags for each threshold."""
+        args = Namespace(
+            group_by="subject_id",
+            fuzzy_ratio_threshold=90,
+            fuzzy_set_threshold=50,
+            sweep_fuzzy_ratio=[60, 100],
+        )
+        df = sweep.flag_counts(sweep.sweep(args, build_table(ROWS)))
+        self.assertEqual(list(df.columns), ["Ratio 60", "Ratio 100"])
+        self.assertEqual(df.sum().tolist(), [3, 3])
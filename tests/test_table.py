@@ -0,0 +1,46 @@
+import unittest
+from argparse import Namespace
+
+from pylib.fields.base_field import Flag
+from pylib.fields.text_field import TextField
+from tests.helpers import build_table
+
+
+def build_subject(values):
+    return build_table([("1", v) for v in values])
+
+
+class TestTable(unittest.TestCase):
+    def test_reconcile_01(self):
+        """It only reconciles the first rows of a subject with too many rows."""
+        args = Namespace(group_by="subject_id", max_per_subject=3)
+        table = build_subject(["a", "b", "b", "a", "a"])
+        reconciled = table.reconcile(args)
+        self.assertEqual(
+            reconciled.rows[0]["text_1"],
+            TextField(
+                name="text",
+                suffix=1,
+                value="b",
+                flag=Flag.MAJORITY,
+                note=(
+                    "Exact match, 2 of 3 records with 0 blanks. "
+                    "Only the first 3 of 5 records were reconciled"
+                ),
+            ),
+        )
+
+    def test_to_df_01(self):
+        """It builds the data frame once for the same options."""
+        args = Namespace(group_by="subject_id", row_key="", user_column="")
+        table = build_subject(["a", "b"])
+        self.assertIs(table.to_df(args), table.to_df(args))
+        self.assertIsNot(table.to_df(args), table.to_df(args, add_note=True))
+
+    def test_to_df_02(self):
+        """Adding a row rebuilds the data frame."""
+        args = Namespace(group_by="subject_id", row_key="", user_column="")
+        table = build_subject(["a", "b"])
+        self.assertEqual(len(table.to_df(args)), 2)
+        table.add(build_subject(["c"]).rows[0])
+        self.assertEqual(table.to_df(args)["text_1"].tolist(), ["a", "b", "c"])
@@ -0,0 +1,63 @@
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+
+from pylib import table_cache
+from pylib.flag import Flag
+from pylib.fields.box_field import BoxField
+from pylib.fields.noop_field import NoOpField
+from pylib.fields.polygon_field import PolygonField
+from pylib.fields.same_field import SameField
+from pylib.table import Table
+from pylib.utils import Point
+from tests.helpers import build_table
+
+ROWS = [(str(i // 2), f"text é {i}") for i in range(3)]
+
+
+def extra(i):
+    return [
+        NoOpField(name="classification_id", value=str(i)),
+        SameField(name="count", value=i),
+        BoxField(name="box", task_id="T2", left=i, right=1.5, top=2, bottom=3),
+        BoxField(name="box", task_id="T2", left=4, right=5, top=6, bottom=7),
+        PolygonField(name="poly", points=[Point(1, 2), Point(3.5, 4)]),
+    ]
+
+
+class TestTableCache(unittest.TestCase):
+    def test_table_cache_01(self):
+        """It reads back the table that was parsed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "input.csv"
+            input_file.write_text("input")
+            args = Namespace(input_file=str(input_file), workflow_id="1001")
+
+            expect = build_table(ROWS, extra)
+            table_cache.read(args, lambda _: expect)
+            actual = table_cache.read(args, lambda _: self.fail("Not cached"))
+
+            self.assertEqual(actual.rows, expect.rows)
+            self.assertEqual(list(actual.types), list(expect.types))
+
+    def test_table_cache_02(self):
+        """It parses the input again when the input file changes."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "input.csv"
+            input_file.write_text("input")
+            args = Namespace(input_file=str(input_file), workflow_id="1001")
+
+            table_cache.read(args, lambda _: build_table(ROWS, extra))
+            input_file.write_text("changed input")
+            actual = table_cache.read(args, lambda _: Table())
+
+            self.assertEqual(len(actual), 0)
+
+    def test_table_cache_03(self):
+        """It decodes a column with every kind of value."""
+        values = ["a", 1, 2.5, True, None, {"a": [1]}, [Point(1, 2)], Flag.OK, "a"]
+        strings = table_cache.StringTable()
+        kinds, nums = table_cache.encode(values, strings)
+        reader = table_cache.StringReader(*strings.arrays())
+        self.assertEqual(table_cache.decode(kinds, nums, reader), values)
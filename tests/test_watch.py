@@ -0,0 +1,92 @@
+import contextlib
+import io
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import reconcile
+from pylib import watch
+from pylib.utils import ReconcileError
+
+EXPORT = "tests/data/nfn1.csv"
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.temp_dir.name)
+        self.reconciled = self.dir / "reconciled.csv"
+        self.args = reconcile.parse_args(
+            ["--watch", str(self.dir), "-r", str(self.reconciled)]
+        )
+        self.args.watch_interval = 0.0
+        self.jobs = []
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def runner(self, args):
+        self.jobs.append(args.input_file)
+        reconcile.run(args)
+
+    def watch(self, polls, runner=None):
+        watch.watch(self.args, runner if runner else self.runner, polls, io.StringIO())
+
+    def test_watch_01(self):
+        """It writes the same output as reconciling the export."""
+        shutil.copy(EXPORT, self.dir / "export.csv")
+        self.watch(polls=2)
+
+        expect = self.dir / "expect.csv"
+        reconcile.run(reconcile.parse_args([EXPORT, "-r", str(expect)]))
+        self.assertEqual(self.reconciled.read_text(), expect.read_text())
+
+    def test_watch_02(self):
+        """It only reconciles an export once, and not its own output files."""
+        shutil.copy(EXPORT, self.dir / "export.csv")
+        self.watch(polls=5)
+        self.assertEqual(self.jobs, [str(self.dir / "export.csv")])
+
+    def test_watch_03(self):
+        """A failed reconciliation leaves the old output in place."""
+
+        def runner(args):
+            Path(args.reconciled).write_text("partial")
+            raise ReconcileError("Workflow 1 has no data.")
+
+        self.reconciled.write_text("old")
+        shutil.copy(EXPORT, self.dir / "export.csv")
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.watch(polls=2, runner=runner)
+        self.assertEqual(self.reconciled.read_text(), "old")
+        names = sorted(p.name for p in self.dir.iterdir())
+        self.assertEqual(names, ["export.csv", "reconciled.csv"])
+
+    def test_watch_04(self):
+        """It waits for a new export to stop changing before it reads it."""
+        sigs = watch.signatures(self.dir, "*.csv")
+        self.assertEqual(sigs, {})
+        shutil.copy(EXPORT, self.dir / "export.csv")
+        self.watch(polls=1)
+        self.assertEqual(self.jobs, [])
+
+    def test_watch_05(self):
+        """It rebuilds the outputs from the newest export."""
+        self.args.workflow_id = 1001
+        shutil.copy(EXPORT, self.dir / "export1.csv")
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors):
+            self.watch(polls=2)
+            shutil.copy("tests/data/nfn2.csv", self.dir / "export2.csv")
+            self.watch(polls=2)
+        self.assertEqual(errors.getvalue(), "")
+        self.assertIsNone(self.args.result_cache)
+        self.assertEqual(
+            self.jobs, [str(self.dir / "export1.csv"), str(self.dir / "export2.csv")]
+        )
+
+        expect = self.dir / "expect.csv"
+        argv = ["tests/data/nfn2.csv", "-w", "1001", "-r", str(expect)]
+        reconcile.run(reconcile.parse_args(argv))
+        self.assertEqual(self.reconciled.read_text(), expect.read_text())